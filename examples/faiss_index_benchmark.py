@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : faiss_index_benchmark.py
+@Desc    : recall and latency of the FAISS index types against the exact results of a flat index
+"""
+import time
+
+import faiss
+import fire
+import numpy as np
+
+from metagpt.const import DATA_PATH
+from metagpt.document_store.document import Document
+from metagpt.document_store.embeddings import HashingEmbeddings
+from metagpt.document_store.faiss_index import FaissIndexConfig, build_index
+from metagpt.logs import logger
+
+CONFIGS = [
+    FaissIndexConfig(type="ivf_flat", nprobe=1),
+    FaissIndexConfig(type="ivf_flat", nprobe=8),
+    FaissIndexConfig(type="ivf_flat", nprobe=32),
+    FaissIndexConfig(type="ivf_pq", nprobe=8),
+    FaissIndexConfig(type="ivf_pq", nprobe=32),
+    FaissIndexConfig(type="hnsw", ef_search=16),
+    FaissIndexConfig(type="hnsw", ef_search=64),
+    FaissIndexConfig(type="hnsw", ef_search=256),
+]
+
+
+def load_vectors(n: int, dim: int, raw_data: str = ""):
+    """Embed the documents of `raw_data`, repeated up to n rows, or n random vectors when it is empty"""
+    if not raw_data:
+        return np.random.default_rng(0).standard_normal((n, dim)).astype(np.float32)
+    docs, _ = Document(DATA_PATH / raw_data, "output", "source").get_docs_and_metadatas()
+    docs = [f"{docs[i % len(docs)]} {i // len(docs)}" for i in range(n)]
+    return np.asarray(HashingEmbeddings(dim).embed_documents(docs), dtype=np.float32)
+
+
+def search(index: faiss.Index, queries: np.ndarray, k: int):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def benchmark(n: int = 100000, dim: int = 128, n_queries: int = 1000, k: int = 10, raw_data: str = ""):
+    """
+    :param n: The vectors in the index.
+    :param raw_data: A document under the data directory to embed with the local embeddings, e.g. qcs/qcs_4w.json.
+    """
+    vectors = load_vectors(n, dim, raw_data)
+    queries = vectors[np.random.default_rng(1).choice(n, n_queries, replace=False)]
+    queries = queries + np.random.default_rng(2).normal(0, 0.01, queries.shape).astype(np.float32)
+
+    flat = build_index(vectors, FaissIndexConfig())
+    truth, latency = search(flat, queries, k)
+    logger.info(f"flat: recall@{k} 1.000, {latency:.3f} ms/query")
+
+    for config in CONFIGS:
+        start = time.perf_counter()
+        index = build_index(vectors, config)
+        build_time = time.perf_counter() - start
+        ids, latency = search(index, queries, k)
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(ids, truth)])
+        knob = f"nprobe={config.nprobe}" if config.type.startswith("ivf") else f"ef_search={config.ef_search}"
+        logger.info(f"{config.type} {knob}: recall@{k} {recall:.3f}, {latency:.3f} ms/query, built in {build_time:.1f}s")
+
+
+if __name__ == '__main__':
+    fire.Fire(benchmark)
@@ -11,7 +11,7 @@ from typing import Optional
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 from metagpt.actions.action_output import ActionOutput
-from metagpt.llm import LLM
+from metagpt.llm import LLM, get_llm
 from metagpt.utils.common import OutputParser
 from metagpt.logs import logger
 
@@ -19,7 +19,7 @@ class Action(ABC):
     def __init__(self, name: str = '', context=None, llm: LLM = None):
         self.name: str = name
         if llm is None:
-            llm = LLM()
+            llm = get_llm()
         self.llm = llm
         self.context = context
         self.prefix = ""
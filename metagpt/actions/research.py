@@ -10,10 +10,11 @@ from pydantic import parse_obj_as
 
 from metagpt.actions import Action
 from metagpt.config import CONFIG
+from metagpt.llm import LLM, get_llm
 from metagpt.logs import logger
 from metagpt.tools.search_engine import SearchEngine
 from metagpt.tools.web_browser_engine import WebBrowserEngine, WebBrowserEngineType
-from metagpt.utils.text import generate_prompt_chunk, reduce_message_length
+from metagpt.utils.text import fit_segments, generate_prompt_chunk
 
 LANG_PROMPT = "Please respond in {language}."
 
@@ -117,16 +118,18 @@ class CollectLinks(Action):
             keywords = [topic]
         results = await asyncio.gather(*(self.search_engine.run(i, as_string=False) for i in keywords))
 
-        def gen_msg():
-            while True:
-                search_results = "\n".join(f"#### Keyword: {i}\n Search Result: {j}\n" for (i, j) in zip(keywords, results))
-                prompt = SUMMARIZE_SEARCH_PROMPT.format(decomposition_nums=decomposition_nums, search_results=search_results)
-                yield prompt
-                remove = max(results, key=len)
-                remove.pop()
-                if len(remove) == 0:
-                    break
-        prompt = reduce_message_length(gen_msg(), self.llm.model, system_text, CONFIG.max_tokens_rsp)
+        def render(kept: list[tuple[int, int]]) -> str:
+            kept_results = [[] for _ in results]
+            for i, j in kept:
+                kept_results[i].append(results[i][j])
+            search_results = "\n".join(f"#### Keyword: {i}\n Search Result: {j}\n" for (i, j) in zip(keywords, kept_results))
+            return SUMMARIZE_SEARCH_PROMPT.format(decomposition_nums=decomposition_nums, search_results=search_results)
+
+        # the lower ranked results of every keyword are dropped first
+        segments = [(i, j) for i, result in enumerate(results) for j in range(len(result))]
+        prompt = fit_segments(
+            segments, render, self.llm.model, system_text, CONFIG.max_tokens_rsp, priorities=[-j for _, j in segments]
+        )
         logger.debug(prompt)
         queries = await self._aask(prompt, [system_text])
         try:
@@ -179,7 +182,7 @@ class WebBrowseAndSummarize(Action):
     ):
         super().__init__(*args, **kwargs)
         if CONFIG.model_for_researcher_summary:
-            self.llm.model = CONFIG.model_for_researcher_summary
+            self.llm = get_llm(model=CONFIG.model_for_researcher_summary)
         self.web_browser_engine = WebBrowserEngine(
             engine=WebBrowserEngineType.CUSTOM if browse_func else None,
             run_func=browse_func,
@@ -239,8 +242,9 @@ class ConductResearch(Action):
     """Action class to conduct research and generate a research report."""
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if CONFIG.model_for_researcher_report:
-            self.llm.model = CONFIG.model_for_researcher_report
+        # a dedicated instance, as auto_max_tokens must not leak into the shared client
+        self.llm = LLM(CONFIG.model_for_researcher_report or self.llm.model)
+        self.llm.auto_max_tokens = True
 
     async def run(
         self,
@@ -260,7 +264,6 @@ class ConductResearch(Action):
         """
         prompt = CONDUCT_RESEARCH_PROMPT.format(topic=topic, content=content)
         logger.debug(prompt)
-        self.llm.auto_max_tokens = True
         return await self._aask(prompt, [system_text])
 
 
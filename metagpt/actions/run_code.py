@@ -5,13 +5,18 @@
 @Author  : alexanderwu
 @File    : run_code.py
 """
+import asyncio
+import hashlib
 import os
-import subprocess
+import sys
 import traceback
-from typing import Tuple
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
 
 from metagpt.actions.action import Action
 from metagpt.logs import logger
+from metagpt.utils.process_pool import get_process_pool
 
 PROMPT_TEMPLATE = """
 Role: You are a senior development and qa engineer, your role is summarize the code running result.
@@ -56,10 +61,38 @@ standard errors: {errs};
 """
 
 
+# results of unchanged code, test code, command and environment, shared by every RunCode of the process
+RESULT_CACHE_SIZE = 1024
+_results: OrderedDict[str, str] = OrderedDict()
+
+
+def _hash_sources(directories: list[str]) -> str:
+    """Hash of the python files the test may import, i.e. of the working directory and python paths"""
+    digest = hashlib.sha256()
+    for directory in directories:
+        for path in sorted(Path(directory).rglob("*.py")):
+            digest.update(str(path).encode("utf-8"))
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
 class RunCode(Action):
     def __init__(self, name="RunCode", context=None, llm=None):
         super().__init__(name, context, llm)
 
+    @classmethod
+    def _cache_key(
+        cls, mode, code, test_code, command, working_directory=None, additional_python_paths=None
+    ) -> Optional[str]:
+        """Key of the result, None for a script without a working directory, as any source it imports is unknown"""
+        parts = [mode, code, test_code, "\0".join(command), sys.executable, sys.version, os.environ.get("PYTHONPATH", "")]
+        if mode == "script":
+            if not working_directory:
+                return None
+            directories = [str(working_directory)] + [str(i) for i in additional_python_paths or []]
+            parts += directories + [_hash_sources(directories)]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
     @classmethod
     async def run_text(cls, code) -> Tuple[str, str]:
         try:
@@ -84,23 +117,20 @@ class RunCode(Action):
         additional_python_paths = ":".join(additional_python_paths)
         env["PYTHONPATH"] = additional_python_paths + ":" + env.get("PYTHONPATH", "")
 
-        # Start the subprocess
-        process = subprocess.Popen(
-            command, cwd=working_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
-        )
-
-        try:
-            # Wait for the process to complete, with a timeout
-            stdout, stderr = process.communicate(timeout=10)
-        except subprocess.TimeoutExpired:
-            logger.info("The command did not complete within the given timeout.")
-            process.kill()  # Kill the process if it times out
-            stdout, stderr = process.communicate()
-        return stdout.decode("utf-8"), stderr.decode("utf-8")
+        # Run the subprocess in the shared pool, with its timeout and resource limits
+        stdout, stderr, _ = await get_process_pool().run(command, cwd=working_directory, env=env)
+        return stdout, stderr
 
     async def run(
         self, code, mode="script", code_file_name="", test_code="", test_file_name="", command=[], **kwargs
     ) -> str:
+        # hashing the sources reads the whole workspace, keep it off the event loop
+        key = await asyncio.to_thread(self._cache_key, mode, code, test_code, command, **kwargs)
+        if key is not None and key in _results:
+            logger.info(f"Code and tests unchanged, reuse the result of {' '.join(command)}")
+            _results.move_to_end(key)
+            return _results[key]
+
         logger.info(f"Running {' '.join(command)}")
         if mode == "script":
             outs, errs = await self.run_script(command=command, **kwargs)
@@ -124,5 +154,9 @@ class RunCode(Action):
         rsp = await self._aask(prompt)
 
         result = context + rsp
+        if key is not None:
+            _results[key] = result
+            if len(_results) > RESULT_CACHE_SIZE:
+                _results.popitem(last=False)
 
         return result
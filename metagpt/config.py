@@ -57,6 +57,11 @@ class Config(metaclass=Singleton):
         self.openai_api_type = self._get("OPENAI_API_TYPE")
         self.openai_api_version = self._get("OPENAI_API_VERSION")
         self.openai_api_rpm = self._get("RPM", 3)
+        self.openai_api_tpm = self._get("TPM", 0)
+        self.rate_limits = self._get("RATE_LIMITS", {})
+        self.llm_pool_size = int(self._get("LLM_POOL_SIZE", 100))
+        self.llm_keepalive = float(self._get("LLM_KEEPALIVE", 30))
+        self.llm_http2 = self._get("LLM_HTTP2", True)
         self.openai_api_model = self._get("OPENAI_API_MODEL", "gpt-4")
         self.max_tokens_rsp = self._get("MAX_TOKENS", 2048)
         self.deployment_name = self._get('DEPLOYMENT_NAME')
@@ -81,6 +86,21 @@ class Config(metaclass=Singleton):
         self.puppeteer_config = self._get("PUPPETEER_CONFIG", "")
         self.mmdc = self._get("MMDC", "mmdc")
         self.calc_usage = self._get("CALC_USAGE", True)
+        self.llm_cache = self._get("LLM_CACHE", False)
+        self.llm_cache_path = self._get("LLM_CACHE_PATH")
+        self.llm_cache_ttl = int(self._get("LLM_CACHE_TTL", 0))
+        self.llm_cache_max_entries = int(self._get("LLM_CACHE_MAX_ENTRIES", 10000))
+        self.embedding_backend = self._get("EMBEDDING_BACKEND", "openai")
+        self.embedding_dim = int(self._get("EMBEDDING_DIM", 256))
+        self.faiss_index = self._get("FAISS_INDEX", {})
+        self.embedding_cache = self._get("EMBEDDING_CACHE", True)
+        self.embedding_cache_path = self._get("EMBEDDING_CACHE_PATH")
+        self.embedding_cache_max_entries = int(self._get("EMBEDDING_CACHE_MAX_ENTRIES", 100000))
+        self.run_code_workers = int(self._get("RUN_CODE_WORKERS", 4))
+        self.run_code_timeout = float(self._get("RUN_CODE_TIMEOUT", 10))
+        self.run_code_cpu_limit = int(self._get("RUN_CODE_CPU_LIMIT", 0))
+        self.run_code_memory_limit = int(self._get("RUN_CODE_MEMORY_LIMIT", 0))
+        self.run_code_max_output = int(self._get("RUN_CODE_MAX_OUTPUT", 1024 * 1024))
         self.model_for_researcher_summary = self._get("MODEL_FOR_RESEARCHER_SUMMARY")
         self.model_for_researcher_report = self._get("MODEL_FOR_RESEARCHER_REPORT")
 
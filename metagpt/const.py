@@ -25,6 +25,8 @@ def get_project_root():
 PROJECT_ROOT = get_project_root()
 DATA_PATH = PROJECT_ROOT / 'data'
 WORKSPACE_ROOT = PROJECT_ROOT / 'workspace'
+TRANSCRIPT_PATH = WORKSPACE_ROOT / 'transcripts'
+CHECKPOINT_PATH = WORKSPACE_ROOT / 'checkpoints'
 PROMPT_PATH = PROJECT_ROOT / 'metagpt/prompts'
 UT_PATH = PROJECT_ROOT / 'data/ut'
 SWAGGER_PATH = UT_PATH / "files/api/"
@@ -35,3 +37,7 @@ TMP = PROJECT_ROOT / 'tmp'
 RESEARCH_PATH = DATA_PATH / "research"
 
 MEM_TTL = 24 * 30 * 3600
+MEM_FLUSH_SIZE = 16  # buffered messages of a MemoryStorage before its index is rewritten
+MEM_FLUSH_INTERVAL = 60  # seconds
+
+PASSES_PER_ROUND = 4  # passes of the woken roles a company runs per round
@@ -2,20 +2,35 @@
 # -*- coding: utf-8 -*-
 import fire
 import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
 from metagpt.actions import BusinessOwnerRequest
+from metagpt.const import CHECKPOINT_PATH, PASSES_PER_ROUND, TRANSCRIPT_PATH
 from metagpt.environment import Environment
 from metagpt.logs import logger
+from metagpt.provider.http_pool import close_aiohttp_session
 from metagpt.roles import Role, BusinessAnalyst, DataArchitect, ProjectManager, DataEngineer
 from metagpt.schema import Message
+from metagpt.utils.checkpoint import (
+    checkpoint_file,
+    dump_costs,
+    find_checkpoint,
+    load_checkpoint,
+    load_costs,
+    save_checkpoint,
+)
 
 
 class DataCompany(BaseModel):
 
     environment: Environment = Field(default_factory=Environment)
     goal: str = Field(default="")
+    checkpoint_dir: Path = Field(default=CHECKPOINT_PATH)
+    checkpoint_path: Optional[Path] = Field(default=None)  # named after the project when not given
 
     def hire(self, roles: list[Role]):
         """Hire roles to cooperate"""
@@ -24,22 +39,48 @@ class DataCompany(BaseModel):
     def start_project(self, goal):
         """Start a project from publishing boss requirement."""
         self.goal = goal
+        self.environment.history.stream_to(TRANSCRIPT_PATH / f"{datetime.now():%Y%m%d%H%M%S}.jsonl")
         self.environment.publish_message(Message(role="Business Owner", content=goal, cause_by=BusinessOwnerRequest))
 
+    def _save(self):
+        """Checkpoint the messages, the roles and the costs, called after every pass of the environment"""
+        if not self.checkpoint_path:
+            self.checkpoint_path = checkpoint_file(self.checkpoint_dir, "data_company", self.goal)
+        state = {"goal": self.goal, "environment": self.environment.dump_state(), "costs": dump_costs()}
+        save_checkpoint(self.checkpoint_path, state)
+        logger.debug(f"Checkpoint saved to {self.checkpoint_path}")
+
+    def resume(self, goal: str = ""):
+        """Resume the project of `goal`, or of the last checkpoint, instead of starting one, the roles must be hired
+        the same way
+
+        Raises:
+            FileNotFoundError: If there is no checkpoint to resume.
+        """
+        if not self.checkpoint_path:
+            self.checkpoint_path = find_checkpoint(self.checkpoint_dir, "data_company", goal)
+        state = load_checkpoint(self.checkpoint_path)
+        self.goal = state["goal"]
+        load_costs(state["costs"])
+        self.environment.load_state(state["environment"])
+        self.environment.history.stream_to(TRANSCRIPT_PATH / f"{datetime.now():%Y%m%d%H%M%S}.jsonl")
+        logger.info(f"Resumed from {self.checkpoint_path}, pending roles: {self.environment.pending}")
+
     async def run(self, n_round=1):
-        """Run company until target round"""
-        while n_round > 0:
-            n_round -= 1
-            logger.debug(f"{n_round=}")
-            logger.info("Running environment now...")
-            await self.environment.run(k=4)
+        """Run company until target round, a round is up to PASSES_PER_ROUND passes of the roles woken by new
+        messages"""
+        logger.info("Running environment now...")
+        await self.environment.run(k=n_round * PASSES_PER_ROUND, on_pass=self._save)
         return self.environment.history
-    
+
 
 async def run(
         goal: str,
-        n_round: int = 1
+        n_round: int = 1,
+        resume: bool = False
 ) -> None:
+    if not goal and not resume:
+        raise SystemExit("A goal is required, unless --resume is given")
     company = DataCompany()
     company.hire([
         BusinessAnalyst(),
@@ -47,7 +88,14 @@ async def run(
         ProjectManager(),
         DataEngineer()
     ])
-    company.start_project(goal)
+    if resume:
+        try:
+            company.resume(goal)
+        except FileNotFoundError as e:
+            logger.error(e)
+            raise SystemExit(1)
+    else:
+        company.start_project(goal)
 
     # print("Roles: ")
     # print(company.environment.roles)
@@ -58,13 +106,26 @@ async def run(
     # print(company.environment.history)
 
     await company.run(n_round=n_round)
+    await close_aiohttp_session()
+
+async def read_file_and_run(file_path, n_round=1, resume=False):
+    content = ""
+    if not resume or Path(file_path).exists():
+        with open(file_path, 'r') as file:
+            content = file.read()
+    await run(content, n_round, resume)
+
+
+def main(file_path: str = 'idea.txt', n_round: int = 1, resume: bool = False):
+    """
+    :param file_path: The file holding the goal of the project.
+    :param n_round: The maximum number of rounds, each of up to 4 passes of the roles woken by new messages.
+    :param resume: Continue the project of the goal, or the last checkpointed one when the file does not exist, from
+    its checkpoint.
+    """
+    asyncio.run(read_file_and_run(file_path, n_round, resume))
 
-async def read_file_and_run(file_path):
-    with open(file_path, 'r') as file:
-        content = file.read()      
-    await run(content)
 
 if __name__ == "__main__":
-    file_path = 'idea.txt'
-    asyncio.run(read_file_and_run(file_path))
+    fire.Fire(main)
     
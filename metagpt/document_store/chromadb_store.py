@@ -10,9 +10,12 @@ import chromadb
 
 class ChromaStore:
     """If inherited from BaseStore, or importing other modules from metagpt, a Python exception occurs, which is strange."""
-    def __init__(self, name):
+    def __init__(self, name, embedding_function=None):
         client = chromadb.Client()
-        collection = client.create_collection(name)
+        if embedding_function:
+            collection = client.create_collection(name, embedding_function=embedding_function)
+        else:
+            collection = client.create_collection(name)
         self.client = client
         self.collection = collection
 
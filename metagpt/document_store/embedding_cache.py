@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : content-addressed on-disk cache of embeddings, shared by every vector store
+
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from metagpt.config import CONFIG
+from metagpt.const import DATA_PATH
+from metagpt.logs import logger
+
+DIGEST_SIZE = 32  # sha256
+EMPTY = bytes(DIGEST_SIZE)
+INITIAL_ROWS = 1024
+
+
+class EmbeddingCache:
+    """
+    Embeddings of one model keyed by the sha256 of the text, in a memory-mapped float32 matrix
+    - `keys.u8` holds the digest of every row, the key index is rebuilt from it when opened
+    - the files grow by doubling up to `max_entries` rows, then the least recently used rows are reused
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100000):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(max_entries, 1)
+        self.dim = 0
+        self._slots: OrderedDict[bytes, int] = OrderedDict()  # digest -> row, in LRU order
+        self._free: list[int] = []
+        self._keys = None
+        self._vectors = None
+        self._open()
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._keys is None else len(self._keys)
+
+    def _open(self):
+        meta = self.path / "meta.json"
+        keys, vectors = self.path / "keys.u8", self.path / "vectors.f32"
+        if meta.exists():
+            self.dim = json.loads(meta.read_text())["dim"]
+        if not (meta.exists() and keys.exists() and vectors.exists()):
+            # left by an interrupted first write, or partly deleted, start empty
+            keys.unlink(missing_ok=True)
+            vectors.unlink(missing_ok=True)
+            return
+        rows = min(keys.stat().st_size // DIGEST_SIZE, vectors.stat().st_size // (self.dim * 4))
+        if not rows:
+            return
+        self._map(rows)
+        used = self._keys.any(axis=1)
+        for row in np.flatnonzero(used):
+            self._slots[self._keys[row].tobytes()] = int(row)
+        self._free = np.flatnonzero(~used)[::-1].tolist()
+
+    def _write_meta(self):
+        """Written once the data files are, through a temporary file so that it is never partial"""
+        meta = self.path / "meta.json"
+        if meta.exists():
+            return
+        tmp = meta.with_name("meta.json.tmp")
+        tmp.write_text(json.dumps({"dim": self.dim}))
+        os.replace(tmp, meta)
+
+    def _map(self, rows: int):
+        """(Re)map the files, extended with empty rows to hold `rows` rows"""
+        for name, width in (("keys.u8", DIGEST_SIZE), ("vectors.f32", self.dim * 4)):
+            with open(self.path / name, "ab") as f:
+                if f.tell() < rows * width:
+                    f.truncate(rows * width)
+        self._keys = np.memmap(self.path / "keys.u8", dtype=np.uint8, mode="r+", shape=(rows, DIGEST_SIZE))
+        self._vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _slot(self) -> int:
+        if not self._free and self.capacity < self.max_entries:
+            rows = min(max(self.capacity * 2, INITIAL_ROWS), self.max_entries)
+            self._free = list(range(rows - 1, self.capacity - 1, -1))
+            self._map(rows)
+        if self._free:
+            return self._free.pop()
+        _, row = self._slots.popitem(last=False)
+        return row
+
+    def _put(self, digest: bytes, vector: np.ndarray):
+        row = self._slot()
+        self._keys[row] = 0  # a reused row is not matched by its former key while being rewritten
+        self._vectors[row] = vector
+        self._keys[row] = np.frombuffer(digest, dtype=np.uint8)
+        self._slots[digest] = row
+
+    def get_many(self, texts: list[str], compute: Callable[[list[str]], list[list[float]]]) -> np.ndarray:
+        """Return the embeddings of `texts`, calling `compute` once with the distinct texts missing from the cache"""
+        digests = [hashlib.sha256(i.encode("utf-8")).digest() for i in texts]
+        missing: dict[bytes, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest in self._slots:
+                self._slots.move_to_end(digest)
+            else:
+                missing.setdefault(digest, text)
+        found = {i: np.array(self._vectors[self._slots[i]]) for i in digests if i in self._slots}
+        if missing:
+            computed = np.asarray(compute(list(missing.values())), dtype=np.float32)
+            if not self.dim:
+                self.dim = computed.shape[1]
+            if computed.shape[1] != self.dim:
+                raise ValueError(f"Embeddings of {computed.shape[1]} dimensions cached in {self.dim} dimensions")
+            for digest, vector in zip(missing, computed):
+                found[digest] = vector
+                self._put(digest, vector)
+            self.flush()
+            self._write_meta()
+            logger.debug(f"Embedding cache hits: {len(texts) - len(missing)}, misses: {len(missing)}")
+        return np.stack([found[i] for i in digests]) if texts else np.empty((0, self.dim), dtype=np.float32)
+
+    def flush(self):
+        if self._keys is not None:
+            self._vectors.flush()
+            self._keys.flush()
+
+    def __len__(self):
+        return len(self._slots)
+
+
+_caches: dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache(model: str) -> EmbeddingCache:
+    """Return the cache of the embeddings of `model`, shared by the process, configured by EMBEDDING_CACHE_* settings"""
+    if model not in _caches:
+        root = Path(CONFIG.embedding_cache_path or DATA_PATH / "embedding_cache")
+        _caches[model] = EmbeddingCache(root / re.sub(r"[^\w.-]", "_", model), CONFIG.embedding_cache_max_entries)
+    return _caches[model]
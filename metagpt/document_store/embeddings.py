@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the embedding providers of the vector stores, remote through the embedding cache, or local
+
+import re
+import zlib
+
+import numpy as np
+from langchain.embeddings import OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
+
+from metagpt.config import CONFIG
+from metagpt.document_store.embedding_cache import get_embedding_cache
+
+
+class EmbeddingProvider(Embeddings):
+    """Embeddings of a named model, also callable on a list of texts as a Chroma embedding function"""
+
+    model: str = ""
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+
+class CachedEmbeddings(EmbeddingProvider):
+    """Embeddings of `model` answered from its EmbeddingCache, only the texts missing from it are embedded, in one batch"""
+
+    def __init__(self, embeddings: Embeddings, model: str):
+        self.embeddings = embeddings
+        self.model = model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not CONFIG.embedding_cache:
+            return self.embeddings.embed_documents(texts)
+        return get_embedding_cache(self.model).get_many(texts, self.embeddings.embed_documents).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        if not CONFIG.embedding_cache:
+            return self.embeddings.embed_query(text)
+        return self.embed_documents([text])[0]
+
+
+class HashingEmbeddings(EmbeddingProvider):
+    """
+    Local embeddings without any model or network: the words, word bigrams and character trigrams of a text are
+    hashed into `dim` signed buckets, counted with sublinear TF, and the vector is L2 normalized
+    - hashing is a sparse random projection of the n-gram counts, so texts sharing n-grams are close in cosine
+    - there is no IDF, an embedding depends on its text only, and is the same wherever and whenever it is computed
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    @staticmethod
+    def _ngrams(text: str) -> list[str]:
+        words = re.findall(r"\w+", text.lower())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            word = f" {word} "
+            grams.extend(word[i:i + 3] for i in range(len(word) - 2))
+        return grams
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            grams = self._ngrams(text)
+            rows.extend([row] * len(grams))
+            hashes.extend(zlib.crc32(i.encode("utf-8")) for i in grams)
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        signs = np.where(hashes >> 31, 1.0, -1.0).astype(np.float32)
+        counts = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(counts, (np.asarray(rows, dtype=np.intp), (hashes % self.dim).astype(np.intp)), signs)
+        vectors = np.sign(counts) * np.log1p(np.abs(counts))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms > 0, norms, 1)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def get_embeddings() -> EmbeddingProvider:
+    """Return the embeddings of every vector store, chosen by EMBEDDING_BACKEND"""
+    if CONFIG.embedding_backend == "local":
+        # cheaper to compute than to look up, not cached
+        return HashingEmbeddings(CONFIG.embedding_dim)
+    return CachedEmbeddings(OpenAIEmbeddings(openai_api_version="2020-11-07"), "text-embedding-ada-002")
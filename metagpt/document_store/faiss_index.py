@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : FAISS index types of the vector stores, exact or approximate, with their training and search knobs
+
+import math
+
+import faiss
+import numpy as np
+from pydantic import BaseModel
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+MIN_POINTS_PER_CENTROID = 39  # FAISS warns when k-means is trained on fewer points per centroid
+
+
+class FaissIndexConfig(BaseModel):
+    """
+    - flat: exact search, O(n) per query
+    - ivf_flat: vectors clustered into `nlist` lists, `nprobe` of them are scanned per query
+    - ivf_pq: as ivf_flat, with vectors compressed into `pq_m` codes of `pq_nbits` bits
+    - hnsw: graph of `hnsw_m` neighbours per node, `ef_search` candidates are explored per query
+    IVF indexes are trained on a sample of at most `train_size` vectors, and at least 39 per k-means centroid, 0 for
+    `nlist` and `pq_m` means automatic: 4 * sqrt(n) lists, and the most codes up to 64 with sub-vectors of at least 4
+    dimensions
+    """
+
+    type: str = "flat"
+    nlist: int = 0
+    nprobe: int = 8
+    pq_m: int = 0
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 40
+    ef_search: int = 64
+    train_size: int = 100000
+
+    @classmethod
+    def from_config(cls) -> "FaissIndexConfig":
+        return cls(**(CONFIG.faiss_index or {}))
+
+    def get_nlist(self, n: int) -> int:
+        return self.nlist or max(1, int(4 * math.sqrt(n)))
+
+    def get_pq_m(self, dim: int) -> int:
+        if self.pq_m:
+            return self.pq_m
+        return max(i for i in range(1, max(min(dim // 4, 64), 1) + 1) if dim % i == 0)
+
+    def min_train_size(self, n: int) -> int:
+        """The vectors needed to train the index of n vectors, 0 if it needs no training"""
+        if self.type == "ivf_flat":
+            return MIN_POINTS_PER_CENTROID * self.get_nlist(n)
+        if self.type == "ivf_pq":
+            return MIN_POINTS_PER_CENTROID * max(self.get_nlist(n), 2 ** self.pq_nbits)
+        return 0
+
+
+def build_index(vectors: np.ndarray, config: FaissIndexConfig) -> faiss.Index:
+    """Return an index of `config.type` holding `vectors`, trained on a sample of them if needed
+
+    Fall back to a flat index when there are too few vectors to train on
+    """
+    if config.type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type {config.type}, expected one of {INDEX_TYPES}")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    if n < config.min_train_size(n):
+        logger.info(f"{n} vectors are too few to train a {config.type} index, use a flat one")
+        index = faiss.IndexFlatL2(dim)
+    elif config.type == "ivf_flat":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, config.get_nlist(n))
+    elif config.type == "ivf_pq":
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, config.get_nlist(n), config.get_pq_m(dim),
+                                 config.pq_nbits)
+    elif config.type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m)
+        index.hnsw.efConstruction = config.ef_construction
+    else:
+        index = faiss.IndexFlatL2(dim)
+
+    if not index.is_trained:
+        size = min(n, max(config.train_size, config.min_train_size(n)))
+        sample = vectors[np.random.default_rng(0).choice(n, size, replace=False)] if size < n else vectors
+        index.train(sample)
+    index.add(vectors)
+    tune_index(index, config)
+    return index
+
+
+def tune_index(index: faiss.Index, config: FaissIndexConfig):
+    """Set the search knobs, they are not all kept by `faiss.write_index`"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = config.nprobe
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = config.ef_search
@@ -6,23 +6,32 @@
 @File    : faiss_store.py
 """
 import pickle
+import uuid
 from pathlib import Path
 from typing import Optional
 
 import faiss
-from langchain.embeddings import OpenAIEmbeddings
+import numpy as np
+from langchain.docstore.document import Document as LangchainDocument
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores import FAISS
 
 from metagpt.const import DATA_PATH
 from metagpt.document_store.base_store import LocalStore
 from metagpt.document_store.document import Document
+from metagpt.document_store.embeddings import get_embeddings
+from metagpt.document_store.faiss_index import FaissIndexConfig, build_index, tune_index
 from metagpt.logs import logger
 
 
 class FaissStore(LocalStore):
-    def __init__(self, raw_data: Path, cache_dir=None, meta_col='source', content_col='output'):
+    def __init__(self, raw_data: Path, cache_dir=None, meta_col='source', content_col='output',
+                 index_config: FaissIndexConfig = None):
         self.meta_col = meta_col
         self.content_col = content_col
+        self.index_config = index_config or FaissIndexConfig.from_config()
+        self._trained_size = 0  # the vectors the index was built from, or held when loaded
         super().__init__(raw_data, cache_dir)
 
     def _load(self) -> Optional["FaissStore"]:
@@ -34,12 +43,51 @@ class FaissStore(LocalStore):
         with open(str(store_file), "rb") as f:
             store = pickle.load(f)
         store.index = index
+        tune_index(index, self.index_config)
+        self._trained_size = index.ntotal
         return store
 
+    def _embeddings(self) -> Embeddings:
+        return get_embeddings()
+
     def _write(self, docs, metadatas):
-        store = FAISS.from_texts(docs, OpenAIEmbeddings(openai_api_version="2020-11-07"), metadatas=metadatas)
+        embeddings = self._embeddings()
+        index = build_index(np.asarray(embeddings.embed_documents(docs), dtype=np.float32), self.index_config)
+        self._trained_size = len(docs)
+        ids = [str(uuid.uuid4()) for _ in docs]
+        documents = [LangchainDocument(page_content=doc, metadata=metadatas[i] if metadatas else {})
+                     for i, doc in enumerate(docs)]
+        store = FAISS(embeddings.embed_query, index, InMemoryDocstore(dict(zip(ids, documents))), dict(enumerate(ids)))
         return store
 
+    def _vectors(self) -> np.ndarray:
+        """The vectors of the store, embedded again from its documents when the index only keeps lossy PQ codes"""
+        index = self.store.index
+        if isinstance(index, faiss.IndexIVFPQ):
+            ids = self.store.index_to_docstore_id
+            docs = [self.store.docstore.search(ids[i]).page_content for i in range(index.ntotal)]
+            return np.asarray(self._embeddings().embed_documents(docs), dtype=np.float32)
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.make_direct_map()
+        return index.reconstruct_n(0, index.ntotal)
+
+    def _rebuild_index(self):
+        """Rebuild the flat index of a growing store into the configured type once it holds enough vectors to train
+        it, then train it again each time the store doubles, so that the lists follow its size"""
+        index = self.store.index
+        n = index.ntotal
+        if self.index_config.type == "flat" or not n:
+            return
+        if type(index) is faiss.IndexFlatL2:
+            if n < self.index_config.min_train_size(n):
+                return
+        elif not self.index_config.min_train_size(n) or n < 2 * self._trained_size:
+            return
+        self.store.index = build_index(self._vectors(), self.index_config)
+        self._trained_size = n
+        logger.info(f"Rebuilt the index of {n} vectors into a {self.index_config.type} one")
+
     def persist(self):
         index_file, store_file = self._get_index_and_store_fname()
         store = self.store
@@ -6,14 +6,16 @@
 @File    : environment.py
 """
 import asyncio
-from typing import Iterable
+from typing import Callable, Iterable, Optional, Type
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from metagpt.memory import Memory
+from metagpt.actions import Action
+from metagpt.memory import Memory, Transcript
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.logs import logger
+from metagpt.utils.serialize import deserialize_message, serialize_message
 
 
 class Environment(BaseModel):
@@ -24,7 +26,10 @@ class Environment(BaseModel):
 
     roles: dict[str, Role] = Field(default_factory=dict)
     memory: Memory = Field(default_factory=Memory)
-    history: str = Field(default='')
+    history: Transcript = Field(default_factory=Transcript)
+    subscribers: dict[Type[Action], list[str]] = Field(default_factory=dict)
+    pending: list[str] = Field(default_factory=list)
+    _published: set[Message] = PrivateAttr(default_factory=set)  # equal in every field, not only in id
 
     class Config:
         arbitrary_types_allowed = True
@@ -35,6 +40,23 @@ class Environment(BaseModel):
         """
         role.set_env(self)
         self.roles[role.profile] = role
+        self.subscribe(role)
+
+    def subscribe(self, role: Role):
+        """按角色关注的动作订阅消息
+           Subscribe the role to messages caused by the actions it watches
+        """
+        for action in role._rc.watch:
+            profiles = self.subscribers.setdefault(action, [])
+            if role.profile not in profiles:
+                profiles.append(role.profile)
+        # messages published before the role joined should still reach it
+        if self.memory.get_by_actions(role._rc.watch):
+            self._wake(role.profile)
+
+    def _wake(self, profile: str):
+        if profile not in self.pending:
+            self.pending.append(profile)
 
     def add_roles(self, roles: Iterable[Role]):
         """增加一批在当前环境的角色
@@ -47,28 +69,57 @@ class Environment(BaseModel):
         """向当前环境发布信息
           Post information to the current environment
         """
-        # self.message_queue.put(message)
+        if message in self._published:
+            return
+        message = message.intern()
+        self._published.add(message)
         self.memory.add(message)
-        self.history += f"\n{message}"
+        self.history.append(message)
+        for profile in self.subscribers.get(message.cause_by, []):
+            self._wake(profile)
 
-    async def run(self, k=4):
-        """处理一次所有信息的运行
-        Process all Role runs at once
+    async def run(self, k=0, on_pass: Optional[Callable[[], None]] = None):
+        """只运行被新消息唤醒的角色，直到没有待处理的角色
+        Run only the roles woken up by new messages until none is pending, stop after k passes when k > 0
+        `on_pass` is called after every pass, when no role is in the middle of an action, e.g. to checkpoint
         """
-        # while not self.message_queue.empty():
-        # message = self.message_queue.get()
-        # rsp = await self.manager.handle(message, self)
-        # self.message_queue.put(rsp)
-        # logger.info("Hello world")
-        for _ in range(k):
-            futures = []
-            for role in self.roles.values():
-                # logger.info("Current role is:")
-                future = role.run()
-                # logger.info("Future is:")
-                futures.append(future)
-
+        n_pass = 0
+        while self.pending and (k <= 0 or n_pass < k):
+            n_pass += 1
+            woken, self.pending = self.pending, []
+            logger.debug(f"pass {n_pass}: waking {woken}")
+            futures = [self.roles[profile].run() for profile in woken if profile in self.roles]
             await asyncio.gather(*futures)
+            if on_pass:
+                on_pass()
+
+    def dump_state(self) -> dict:
+        """The runtime state to checkpoint: the published messages, the pending roles and the state of every role"""
+        return {
+            "history": [serialize_message(i) for i in self.history],
+            "pending": list(self.pending),
+            "roles": {profile: role.dump_state() for profile, role in self.roles.items()},
+        }
+
+    def load_state(self, state: dict):
+        """Restore the state of `dump_state` into the roles hired the same way, without waking anyone new"""
+        for i in state["history"]:
+            message = deserialize_message(i).intern()
+            self._published.add(message)
+            self.memory.add(message)
+            self.history.append(message)
+        self.pending = [i for i in state["pending"] if i in self.roles]
+        for profile, role_state in state["roles"].items():
+            if profile not in self.roles:
+                logger.warning(f"{profile} is in the checkpoint but not hired, skip it")
+                continue
+            self.roles[profile].load_state(role_state)
+
+    def get_news(self, cursor: int) -> list[Message]:
+        """获取游标之后发布的消息
+           Get the messages published after the given cursor of the append-only history
+        """
+        return self.history[cursor:]
 
     def get_roles(self) -> dict[str, Role]:
         """获得环境内的所有角色
@@ -6,11 +6,31 @@
 @File    : llm.py
 """
 
+from metagpt.config import CONFIG
 from metagpt.provider.anthropic_api import Claude2 as Claude
 from metagpt.provider.openai_api import OpenAIGPTAPI as LLM
 
-DEFAULT_LLM = LLM()
-CLAUDE_LLM = Claude()
+_PROVIDERS = {
+    "openai": LLM,
+    "claude": Claude,
+}
+_LLMS = {}
+
+
+def get_llm(provider: str = "openai", model: str = None):
+    """获取进程内按 provider/model/endpoint 共享的 LLM 客户端
+       Get the LLM client shared by the whole process for the provider/model/endpoint
+    """
+    endpoint = CONFIG.openai_api_base if provider == "openai" else None
+    key = (provider, model, endpoint)
+    if key not in _LLMS:
+        llm_class = _PROVIDERS[provider]
+        _LLMS[key] = llm_class(model) if model else llm_class()
+    return _LLMS[key]
+
+
+DEFAULT_LLM = get_llm()
+CLAUDE_LLM = get_llm("claude")
 
 async def ai_func(prompt):
     """使用LLM进行QA
@@ -8,7 +8,8 @@
 from metagpt.actions import Action
 from metagpt.const import PROMPT_PATH
 from metagpt.document_store.chromadb_store import ChromaStore
-from metagpt.llm import LLM
+from metagpt.document_store.embeddings import get_embeddings
+from metagpt.llm import get_llm
 from metagpt.logs import logger
 
 Skill = Action
@@ -18,8 +19,8 @@ class SkillManager:
     """Used to manage all skills"""
 
     def __init__(self):
-        self._llm = LLM()
-        self._store = ChromaStore('skill_manager')
+        self._llm = get_llm()
+        self._store = ChromaStore('skill_manager', embedding_function=get_embeddings())
         self._skills: dict[str: Skill] = {}
 
     def add_skill(self, skill: Skill):
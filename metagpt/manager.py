@@ -5,13 +5,13 @@
 @Author  : alexanderwu
 @File    : manager.py
 """
-from metagpt.llm import LLM
+from metagpt.llm import LLM, get_llm
 from metagpt.logs import logger
 from metagpt.schema import Message
 
 
 class Manager:
-    def __init__(self, llm: LLM = LLM()):
+    def __init__(self, llm: LLM = get_llm()):
         self.llm = llm  # Large Language Model
         self.role_directions = {
             "BOSS": "Product Manager",
@@ -8,9 +8,13 @@
 
 from metagpt.memory.memory import Memory
 from metagpt.memory.longterm_memory import LongTermMemory
+from metagpt.memory.transcript import Transcript
+from metagpt.memory.context_builder import ContextBuilder
 
 
 __all__ = [
     "Memory",
     "LongTermMemory",
+    "Transcript",
+    "ContextBuilder",
 ]
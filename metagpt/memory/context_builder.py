@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : assemble the context of an action from indexed memory, within the token budget of the model
+
+from typing import Iterable, Type
+
+from metagpt.actions import Action
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+from metagpt.utils.token_counter import TOKEN_MAX, count_strings_tokens, get_encoding
+
+
+class ContextBuilder:
+    """
+    Build the context in priority order instead of passing the whole history:
+    1. the messages of `prefix_actions`, in that order, e.g. design then tasks; assembled once and cached until
+       memory holds new ones, the lowest priority ones are truncated or dropped if they exceed the budget
+    2. the messages of `detail_actions`, e.g. written code, as many as fit: the given ones first, e.g. the dependencies
+       of the file to write, then the related ones, then the most recent
+    """
+
+    def __init__(self, memory: Memory, prefix_actions: Iterable[Type[Action]], detail_actions: Iterable[Type[Action]],
+                 model: str, reserved: int = 0):
+        self.memory = memory
+        self.prefix_actions = list(prefix_actions)
+        self.detail_actions = list(detail_actions)
+        self.model = model
+        self.budget = max(TOKEN_MAX.get(model, 2048) - reserved, 0)
+        self._prefix_key = None
+        self._prefix = ("", 0)
+
+    def _build_prefix(self) -> tuple[str, int]:
+        msgs = self.memory.get_by_actions(self.prefix_actions)
+        key = tuple(i.id for i in msgs)
+        if key == self._prefix_key:
+            return self._prefix
+
+        texts, used = [], 0
+        all_texts = [str(i) for i in msgs]
+        for text, count in zip(all_texts, count_strings_tokens(all_texts, self.model)):
+            if used + count > self.budget:
+                text = self._truncate(text, self.budget - used)
+                texts.append(text)
+                used = self.budget
+                break
+            texts.append(text)
+            used += count
+        self._prefix_key, self._prefix = key, ("\n".join(texts), used)
+        return self._prefix
+
+    def _truncate(self, text: str, max_token: int) -> str:
+        encoding = get_encoding(self.model)
+        return encoding.decode(encoding.encode_ordinary(text)[:max_token])
+
+    def build(self, related: str = "", first: Iterable[Message] = ()) -> str:
+        """Return the context, putting first the messages of `first`, then the detail messages mentioning `related`,
+        e.g. the file to write
+        """
+        prefix, used = self._build_prefix()
+        first = list(first)
+        ids = {i.id for i in first}
+        details = first + [i for i in self.memory.get_by_actions(self.detail_actions) if i.id not in ids]
+        texts = [str(i) for i in details]
+        counts = count_strings_tokens(texts, self.model)
+        ranked = list(range(len(first))) + sorted(
+            range(len(first), len(details)),
+            key=lambda i: (bool(related) and related in details[i].content, i),
+            reverse=True,
+        )
+        kept = set()
+        for i in ranked:
+            if used + counts[i] <= self.budget:
+                kept.add(i)
+                used += counts[i]
+        return "\n".join([prefix] + [texts[i] for i in sorted(kept)])
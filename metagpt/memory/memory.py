@@ -6,6 +6,7 @@
 @File    : memory.py
 """
 from collections import defaultdict
+from itertools import islice
 from typing import Iterable, Type
 
 from metagpt.actions import Action
@@ -16,40 +17,50 @@ class Memory:
     """The most basic memory: super-memory"""
 
     def __init__(self):
-        """Initialize an empty storage list and an empty index dictionary"""
-        self.storage: list[Message] = []
-        self.index: dict[Type[Action], list[Message]] = defaultdict(list)
+        """Initialize an empty storage and empty indexes, all keyed by message id"""
+        self.storage: dict[str, Message] = {}
+        self.index: dict[Type[Action], dict[str, Message]] = defaultdict(dict)
+        self.role_index: dict[str, dict[str, Message]] = defaultdict(dict)
 
     def add(self, message: Message):
-        """Add a new message to storage, while updating the index"""
-        if message in self.storage:
+        """Add a new message to storage, while updating the indexes"""
+        if message.id in self.storage:
             return
-        self.storage.append(message)
+        message = message.intern()  # the memories of all roles share one instance of a message
+        self.storage[message.id] = message
         if message.cause_by:
-            self.index[message.cause_by].append(message)
+            self.index[message.cause_by][message.id] = message
+        self.role_index[message.role][message.id] = message
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
             self.add(message)
 
+    def __contains__(self, message: Message) -> bool:
+        return message.id in self.storage
+
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        if role not in self.role_index:
+            return []
+        return list(self.role_index[role].values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        return [message for message in self.storage.values() if content in message.content]
 
     def delete(self, message: Message):
-        """Delete the specified message from storage, while updating the index"""
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        """Delete the specified message from storage, while updating the indexes"""
+        message = self.storage.pop(message.id)
+        if message.cause_by:
+            self.index[message.cause_by].pop(message.id, None)
+        self.role_index[message.role].pop(message.id, None)
 
     def clear(self):
-        """Clear storage and index"""
-        self.storage = []
-        self.index = defaultdict(list)
+        """Clear storage and indexes"""
+        self.storage = {}
+        self.index = defaultdict(dict)
+        self.role_index = defaultdict(dict)
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -57,25 +68,28 @@ class Memory:
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return [message for message in self.storage.values() if keyword in message.content]
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
-        return self.storage[-k:]
+        if k <= 0:
+            return list(self.storage.values())
+        return list(islice(reversed(self.storage.values()), k))[::-1]
 
     def remember(self, observed: list[Message], k=0) -> list[Message]:
         """remember the most recent k memories from observed Messages, return all when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if k <= 0:
+            already_observed = self.storage
+        else:
+            already_observed = {i.id: i for i in self.get(k)}
+        # the same message sent to someone else, or with other instruct_content, is news
+        return [i for i in observed if already_observed.get(i.id) != i]
 
     def get_by_action(self, action: Type[Action]) -> list[Message]:
         """Return all messages triggered by a specified Action"""
-        return self.index[action]
+        if action not in self.index:
+            return []
+        return list(self.index[action].values())
 
     def get_by_actions(self, actions: Iterable[Type[Action]]) -> list[Message]:
         """Return all messages triggered by specified Actions"""
@@ -83,9 +97,8 @@ class Memory:
         for action in actions:
             if action not in self.index:
                 continue
-            rsp += self.index[action]
+            rsp += self.index[action].values()
         return rsp
-    
+
     def __str__(self):
-        return f"Storage: {self.storage}\nIndex: {self.index}"
-    
\ No newline at end of file
+        return f"Storage: {self.get()}\nIndex: {dict(self.index)}"
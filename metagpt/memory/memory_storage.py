@@ -2,31 +2,62 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the implement of memory storage
 
+import atexit
+import pickle
+import time
+import weakref
 from typing import List
 from pathlib import Path
 
+import numpy as np
 from langchain.vectorstores.faiss import FAISS
 
-from metagpt.const import DATA_PATH, MEM_TTL
+from metagpt.const import DATA_PATH, MEM_FLUSH_INTERVAL, MEM_FLUSH_SIZE, MEM_TTL
 from metagpt.logs import logger
 from metagpt.schema import Message
 from metagpt.utils.serialize import serialize_message, deserialize_message
+from metagpt.document_store.faiss_index import FaissIndexConfig
 from metagpt.document_store.faiss_store import FaissStore
 
 
+_storages: "weakref.WeakSet[MemoryStorage]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for storage in list(_storages):
+        try:
+            storage.flush()
+        except Exception as e:
+            logger.error(f"Agent {storage.role_id} failed to flush its memory, kept in its log: {e}")
+
+
 class MemoryStorage(FaissStore):
     """
-    The memory storage with Faiss as ANN search engine
+    The memory storage with Faiss as ANN search engine, written behind
+    - added messages are buffered and appended to a log, so that they survive a crash
+    - the buffer is embedded in one batch and appended to the index when searched or flushed
+    - the index files are rewritten, and the log emptied, every `flush_size` messages or `flush_interval` seconds,
+      and at exit
     """
 
-    def __init__(self, mem_ttl: int = MEM_TTL):
+    def __init__(self, mem_ttl: int = MEM_TTL, flush_size: int = MEM_FLUSH_SIZE,
+                 flush_interval: float = MEM_FLUSH_INTERVAL, index_config: FaissIndexConfig = None):
         self.role_id: str = None
         self.role_mem_path: str = None
         self.mem_ttl: int = mem_ttl  # later use
         self.threshold: float = 0.1  # experience value. TODO The threshold to filter similar memories
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.index_config = index_config or FaissIndexConfig.from_config()
+        self._trained_size = 0
         self._initialized: bool = False
 
         self.store: FAISS = None  # Faiss engine
+        self._buffer: list[Message] = []  # added but not in the index yet
+        self._unpersisted = 0  # messages in the index but not in the index files yet
+        self._last_flush = time.monotonic()
+        _storages.add(self)
 
     @property
     def is_initialized(self) -> bool:
@@ -47,8 +78,33 @@ class MemoryStorage(FaissStore):
                 messages.append(deserialize_message(document.metadata.get("message_ser")))
             self._initialized = True
 
+        # messages added after the last flush, skipping those persisted just before a crash
+        ids = {i.id for i in messages}
+        self._buffer = [i for i in self._read_log() if i.id not in ids]
+        if self._buffer:
+            self._initialized = True
+        return messages + self._buffer
+
+    def _log_fname(self) -> Path:
+        return Path(self.role_mem_path / f'{self.role_id}.log')
+
+    def _read_log(self) -> List[Message]:
+        log_fpath = self._log_fname()
+        if not log_fpath.exists():
+            return []
+        messages = []
+        with open(log_fpath, "rb") as f:
+            while True:
+                try:
+                    messages.append(deserialize_message(pickle.load(f)))
+                except (EOFError, pickle.UnpicklingError):
+                    break  # the end, or a record cut by a crash
         return messages
 
+    def _append_log(self, message: Message):
+        with open(self._log_fname(), "ab") as f:
+            pickle.dump(serialize_message(message), f)
+
     def _get_index_and_store_fname(self):
         if not self.role_mem_path:
             logger.error(f'You should call {self.__class__.__name__}.recover_memory fist when using LongTermMemory')
@@ -63,37 +119,68 @@ class MemoryStorage(FaissStore):
 
     def add(self, message: Message) -> bool:
         """ add message into memory storage"""
-        docs = [message.content]
-        metadatas = [{"message_ser": serialize_message(message)}]
+        if self.role_mem_path:
+            self._append_log(message)
+        self._buffer.append(message)
+        self._initialized = True
+        logger.info(f"Agent {self.role_id}'s memory_storage add a message")
+        if len(self._buffer) + self._unpersisted >= self.flush_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _index_buffer(self):
+        """Embed the buffered messages in one batch and append them to the index"""
+        if not self._buffer:
+            return
+        docs = [i.content for i in self._buffer]
+        metadatas = [{"message_ser": serialize_message(i)} for i in self._buffer]
         if not self.store:
             # init Faiss
             self.store = self._write(docs, metadatas)
-            self._initialized = True
         else:
-            self.store.add_texts(texts=docs, metadatas=metadatas)
+            # `add_texts` would embed the texts one by one
+            self.store.add_embeddings(zip(docs, self._embeddings().embed_documents(docs)), metadatas=metadatas)
+        self._unpersisted += len(self._buffer)
+        self._buffer = []
+
+    def flush(self):
+        """Index the buffered messages, rewrite the index files and empty the log"""
+        self._index_buffer()
+        self._last_flush = time.monotonic()
+        if not self._unpersisted or not self.role_mem_path:
+            return
+        self._rebuild_index()
         self.persist()
-        logger.info(f"Agent {self.role_id}'s memory_storage add a message")
+        self._log_fname().unlink(missing_ok=True)
+        self._unpersisted = 0
 
     def search(self, message: Message, k=4) -> List[Message]:
         """search for dissimilar messages"""
-        if not self.store:
-            return []
-
-        resp = self.store.similarity_search_with_score(
-            query=message.content,
-            k=k
-        )
-        # filter the result which score is smaller than the threshold
-        filtered_resp = []
-        for item, score in resp:
-            # the smaller score means more similar relation
-            if score < self.threshold:
-                continue
-            # convert search result into Memory
-            metadata = item.metadata
-            new_mem = deserialize_message(metadata.get("message_ser"))
-            filtered_resp.append(new_mem)
-        return filtered_resp
+        return self.search_many([message], k=k, deserialize=True)[0]
+
+    def search_many(self, messages: List[Message], k=4, deserialize=False) -> List[list]:
+        """search for dissimilar messages of every message at once, with one batch of embeddings and one index search
+
+        Return the contents of the dissimilar messages of every message, or the messages when `deserialize`
+        """
+        self._index_buffer()
+        if not self.store or not messages:
+            return [[] for _ in messages]
+
+        queries = np.asarray(self._embeddings().embed_documents([i.content for i in messages]), dtype=np.float32)
+        scores, indices = self.store.index.search(queries, k)
+        results = []
+        for row_scores, row_indices in zip(scores, indices):
+            filtered_resp = []
+            for score, i in zip(row_scores, row_indices):
+                # the smaller score means more similar relation, -1 is a missing neighbour
+                if i == -1 or score < self.threshold:
+                    continue
+                item = self.store.docstore.search(self.store.index_to_docstore_id[i])
+                filtered_resp.append(deserialize_message(item.metadata.get("message_ser")) if deserialize
+                                     else item.page_content)
+            results.append(filtered_resp)
+        return results
 
     def clean(self):
         index_fpath, storage_fpath = self._get_index_and_store_fname()
@@ -101,7 +188,11 @@ class MemoryStorage(FaissStore):
             index_fpath.unlink(missing_ok=True)
         if storage_fpath and storage_fpath.exists():
             storage_fpath.unlink(missing_ok=True)
+        if self.role_mem_path:
+            self._log_fname().unlink(missing_ok=True)
 
         self.store = None
+        self._buffer = []
+        self._unpersisted = 0
         self._initialized = False
         
\ No newline at end of file
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the append-only transcript of an environment
+
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+from metagpt.schema import Message
+
+
+class Transcript:
+    """
+    Append-only list of published messages
+    - render the text on demand instead of concatenating strings on every publish
+    - optionally stream every message into a JSONL file
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.messages: list[Message] = []
+        self.path: Optional[Path] = None
+        if path:
+            self.stream_to(path)
+
+    def stream_to(self, path: Path):
+        """Write the messages so far into `path` and append every following message to it"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(self._dumps(i) for i in self.messages)
+        self.path = path
+
+    def append(self, message: Message):
+        self.messages.append(message)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._dumps(message))
+
+    def render(self, start: int = 0, end: Optional[int] = None) -> str:
+        return "".join(f"\n{i}" for i in self.messages[start:end])
+
+    def iter_pages(self, page_size: int = 20) -> Iterator[list[Message]]:
+        """Yield the messages page by page"""
+        for i in range(0, len(self.messages), page_size):
+            yield self.messages[i : i + page_size]
+
+    @staticmethod
+    def _dumps(message: Message) -> str:
+        cause_by = getattr(message.cause_by, "__name__", message.cause_by)
+        record = {
+            "id": message.id,
+            "role": message.role,
+            "cause_by": str(cause_by),
+            "sent_from": message.sent_from,
+            "send_to": message.send_to,
+            "content": message.content,
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def __getitem__(self, item):
+        return self.messages[item]
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __str__(self):
+        return self.render()
@@ -5,31 +5,125 @@
 @Author  : Leo Xiao
 @File    : anthropic_api.py
 """
-
 import anthropic
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 from metagpt.config import CONFIG
+from metagpt.logs import logger
+from metagpt.provider.base_gpt_api import BaseGPTAPI
+from metagpt.provider.http_pool import get_httpx_limits, get_httpx_transport
+from metagpt.provider.openai_api import CostManager
+from metagpt.provider.rate_limiter import get_rate_limiter
 
 
-class Claude2:
-    def ask(self, prompt):
-        client = Anthropic(api_key=CONFIG.claude_api_key)
+class Claude2(BaseGPTAPI):
+    """Anthropic provider, async calls go through AsyncAnthropic and never block the event loop"""
 
-        res = client.completions.create(
-            model="claude-2",
-            prompt=f"{anthropic.HUMAN_PROMPT} {prompt} {anthropic.AI_PROMPT}",
-            max_tokens_to_sample=1000,
+    def __init__(self, model: str = "claude-2"):
+        self.model = model
+        self.max_tokens_to_sample = CONFIG.max_tokens_rsp
+        self.client = Anthropic(
+            api_key=CONFIG.claude_api_key,
+            connection_pool_limits=get_httpx_limits(),
+            transport=get_httpx_transport(is_async=False),
+        )
+        self.aclient = AsyncAnthropic(
+            api_key=CONFIG.claude_api_key,
+            connection_pool_limits=get_httpx_limits(),
+            transport=get_httpx_transport(is_async=True),
         )
-        return res.completion
+        self._cost_manager = CostManager()
+        self._rate_limiter = get_rate_limiter(self.model)
 
-    async def aask(self, prompt):
-        client = Anthropic(api_key=CONFIG.claude_api_key)
+    def messages_to_prompt(self, messages: list[dict]) -> str:
+        """[{"role": "user", "content": msg}] to the Human/Assistant prompt of Claude, which must start with a Human
+        turn, so system messages go at the start of the first one
+        """
+        system = "\n".join(i["content"] for i in messages if i["role"] == "system")
+        turns = [[i["role"], i["content"]] for i in messages if i["role"] in ("user", "assistant")]
+        if not turns or turns[0][0] != "user":
+            turns.insert(0, ["user", system])
+        elif system:
+            turns[0][1] = f"{system}\n\n{turns[0][1]}"
+        prefixes = {"user": anthropic.HUMAN_PROMPT, "assistant": anthropic.AI_PROMPT}
+        return "".join(f"{prefixes[role]} {content}" for role, content in turns) + anthropic.AI_PROMPT
+
+    def _cons_kwargs(self, messages: list[dict]) -> dict:
+        return {
+            "model": self.model,
+            "prompt": self.messages_to_prompt(messages),
+            "max_tokens_to_sample": self.max_tokens_to_sample,
+            "temperature": 0.3,
+        }
+
+    def _to_rsp(self, text: str, usage: dict) -> dict:
+        """Shape the completion like OpenAI's, so that get_choice_text works"""
+        return {"choices": [{"message": {"role": "assistant", "content": text}}], "usage": usage}
+
+    def _calc_usage(self, prompt: str, rsp: str) -> dict:
+        if not CONFIG.calc_usage:
+            return {}
+        try:
+            return {
+                "prompt_tokens": self.client.count_tokens(prompt),
+                "completion_tokens": self.client.count_tokens(rsp),
+            }
+        except Exception as e:
+            logger.error(f"usage calculation failed! {e}")
+            return {}
+
+    def _update_costs(self, usage: dict):
+        if not usage:
+            return
+        try:
+            self._cost_manager.update_cost(usage["prompt_tokens"], usage["completion_tokens"], self.model)
+        except Exception as e:
+            logger.error(f"updating costs failed! {e}")
+
+    async def _acquire(self, kwargs: dict) -> int:
+        estimated = len(kwargs["prompt"]) // 4 + kwargs["max_tokens_to_sample"]
+        await self._rate_limiter.acquire(estimated)
+        return estimated
+
+    def _reconcile(self, estimated: int, usage: dict):
+        if usage:
+            self._rate_limiter.reconcile(estimated, usage["prompt_tokens"] + usage["completion_tokens"])
+
+    def completion(self, messages: list[dict]) -> dict:
+        kwargs = self._cons_kwargs(messages)
+        res = self.client.completions.create(**kwargs)
+        usage = self._calc_usage(kwargs["prompt"], res.completion)
+        self._update_costs(usage)
+        return self._to_rsp(res.completion, usage)
+
+    async def acompletion(self, messages: list[dict]) -> dict:
+        kwargs = self._cons_kwargs(messages)
+        estimated = await self._acquire(kwargs)
+        res = await self.aclient.completions.create(**kwargs)
+        usage = self._calc_usage(kwargs["prompt"], res.completion)
+        self._update_costs(usage)
+        self._reconcile(estimated, usage)
+        return self._to_rsp(res.completion, usage)
+
+    async def _acompletion_stream(self, messages: list[dict]) -> str:
+        kwargs = self._cons_kwargs(messages)
+        estimated = await self._acquire(kwargs)
+        stream = await self.aclient.completions.create(**kwargs, stream=True)
+        collected = []
+        async for chunk in stream:
+            collected.append(chunk.completion)
+            print(chunk.completion, end="")
+        print()
+        full_reply_content = "".join(collected)
+        usage = self._calc_usage(kwargs["prompt"], full_reply_content)
+        self._update_costs(usage)
+        self._reconcile(estimated, usage)
+        return full_reply_content
+
+    async def acompletion_text(self, messages: list[dict], stream=False) -> str:
+        """when streaming, print each token in place."""
+        if stream:
+            return await self._acompletion_stream(messages)
+        rsp = await self.acompletion(messages)
+        return self.get_choice_text(rsp)
 
-        res = client.completions.create(
-            model="claude-2",
-            prompt=f"{anthropic.HUMAN_PROMPT} {prompt} {anthropic.AI_PROMPT}",
-            max_tokens_to_sample=1000,
-        )
-        return res.completion
-    
\ No newline at end of file
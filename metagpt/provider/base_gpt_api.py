@@ -6,10 +6,12 @@
 @File    : base_gpt_api.py
 """
 from abc import abstractmethod
-from typing import Optional
+from functools import partial
+from typing import AsyncIterator, Optional, Union
 
 from metagpt.logs import logger
 from metagpt.provider.base_chatbot import BaseChatbot
+from metagpt.provider.batch_engine import AIMDLimit, as_completed_adaptive
 
 
 class BaseGPTAPI(BaseChatbot):
@@ -104,6 +106,28 @@ class BaseGPTAPI(BaseChatbot):
     async def acompletion_text(self, messages: list[dict], stream=False) -> str:
         """Asynchronous version of completion. Return str. Support stream-print"""
 
+    async def acompletion_batch_iter(self, batch: list[list[dict]], text=False,
+                                     limit: AIMDLimit = None) -> AsyncIterator[tuple[int, Union[dict, str]]]:
+        """Yield (index in batch, response) in completion order, keeping an adaptive number of requests in flight"""
+        func = self.acompletion_text if text else self.acompletion
+        async for idx, rsp in as_completed_adaptive([partial(func, prompt) for prompt in batch], limit):
+            yield idx, rsp
+
+    async def acompletion_batch(self, batch: list[list[dict]]) -> list[dict]:
+        """Return full JSON, in the order of batch"""
+        results = [None] * len(batch)
+        async for idx, rsp in self.acompletion_batch_iter(batch):
+            results[idx] = rsp
+        return results
+
+    async def acompletion_batch_text(self, batch: list[list[dict]]) -> list[str]:
+        """Only return plain text, in the order of batch"""
+        results = [None] * len(batch)
+        async for idx, rsp in self.acompletion_batch_iter(batch, text=True):
+            logger.info(f"Result of task {idx + 1}: {rsp}")
+            results[idx] = rsp
+        return results
+
     def get_choice_text(self, rsp: dict) -> str:
         """Required to provide the first text of choice"""
         return rsp.get("choices")[0]["message"]["content"]
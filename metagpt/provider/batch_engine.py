@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : streaming batch engine keeping an adaptive (AIMD) number of LLM requests in flight
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from metagpt.logs import logger
+
+
+def is_rate_limit_error(e: BaseException) -> bool:
+    """Both openai.error.RateLimitError and anthropic.RateLimitError mean HTTP 429"""
+    return type(e).__name__ == "RateLimitError"
+
+
+class AIMDLimit:
+    """
+    Concurrency bound adapted by additive increase / multiplicative decrease
+    - every success within the latency tolerance adds 1/limit, that is about +1 per round trip
+    - a 429 halves the bound, a slow response shrinks it a little
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64, backoff: float = 0.5,
+                 latency_backoff: float = 0.9, latency_tolerance: float = 3.0):
+        self.value = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_latency = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, int(self.value))
+
+    def on_success(self, latency: float):
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if latency > self.min_latency * self.latency_tolerance:
+            self.value = max(self.minimum, self.value * self.latency_backoff)
+        else:
+            self.value = min(self.maximum, self.value + 1 / self.value)
+
+    def on_throttle(self):
+        self.value = max(self.minimum, self.value * self.backoff)
+        logger.info(f"Rate limited, concurrency bound decreased to {self.limit}")
+
+
+async def as_completed_adaptive(
+    factories: list[Callable[[], Awaitable[Any]]],
+    limit: AIMDLimit = None,
+    max_throttle_retries: int = 5,
+) -> AsyncIterator[tuple[int, Any]]:
+    """Run the coroutine factories with a bounded, adaptive number in flight, yield (index, result) as they finish
+
+    A throttled request is put back in front of the queue, any other error cancels the rest and is raised.
+    """
+    limit = limit or AIMDLimit()
+    pending = deque(enumerate(factories))
+    retries = [0] * len(factories)
+    in_flight: dict[asyncio.Task, tuple[int, float]] = {}
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < limit.limit:
+                idx, factory = pending.popleft()
+                in_flight[asyncio.ensure_future(factory())] = (idx, time.monotonic())
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                idx, started = in_flight.pop(task)
+                e = task.exception()
+                if e is None:
+                    limit.on_success(time.monotonic() - started)
+                    yield idx, task.result()
+                elif is_rate_limit_error(e) and retries[idx] < max_throttle_retries:
+                    retries[idx] += 1
+                    limit.on_throttle()
+                    pending.appendleft((idx, factories[idx]))
+                else:
+                    raise e
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : keep-alive, connection-pooled HTTP clients shared by the LLM providers
+
+import asyncio
+import importlib.util
+import weakref
+
+import aiohttp
+import httpx
+
+from metagpt.config import CONFIG
+
+# aiohttp sessions are bound to the event loop they are created in
+_aiohttp_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    """Return the pooled session of the running event loop, create it on first use"""
+    loop = asyncio.get_running_loop()
+    session = _aiohttp_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=CONFIG.llm_pool_size, keepalive_timeout=CONFIG.llm_keepalive)
+        session = aiohttp.ClientSession(connector=connector)
+        _aiohttp_sessions[loop] = session
+    return session
+
+
+async def close_aiohttp_session():
+    """Close the pooled session of the running event loop, call it before the loop exits"""
+    session = _aiohttp_sessions.pop(asyncio.get_running_loop(), None)
+    if session and not session.closed:
+        await session.close()
+
+
+def http2_available() -> bool:
+    return bool(CONFIG.llm_http2) and importlib.util.find_spec("h2") is not None
+
+
+def get_httpx_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=CONFIG.llm_pool_size,
+        max_keepalive_connections=CONFIG.llm_pool_size,
+        keepalive_expiry=CONFIG.llm_keepalive,
+    )
+
+
+def get_httpx_transport(is_async: bool = True):
+    """Return a pooled httpx transport, using HTTP/2 when `h2` is installed; None means the client's default"""
+    if not http2_available():
+        return None
+    transport_class = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+    return transport_class(http2=True, limits=get_httpx_limits())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : content-addressed on-disk cache of LLM responses
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.const import DATA_PATH
+from metagpt.logs import logger
+from metagpt.utils.singleton import Singleton
+
+
+class LLMCache(metaclass=Singleton):
+    """SQLite backed response cache, with TTL and LRU eviction by number of entries"""
+
+    def __init__(self, path: Path = None, ttl: int = None, max_entries: int = None):
+        path = Path(path or CONFIG.llm_cache_path or DATA_PATH / "llm_cache.sqlite")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl if ttl is not None else CONFIG.llm_cache_ttl  # seconds, 0 means never expire
+        self.max_entries = max_entries if max_entries is not None else CONFIG.llm_cache_max_entries
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict], temperature: float, max_tokens: int) -> str:
+        raw = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        value, created = row
+        now = time.time()
+        if self.ttl and created + self.ttl < now:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count <= self.max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)",
+            (count - self.max_entries,),
+        )
+        logger.debug(f"LLM cache evicted {count - self.max_entries} entries")
+
+    def clear(self):
+        self._conn.execute("DELETE FROM llm_cache")
+        self._conn.commit()
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
@@ -5,7 +5,6 @@
 @File    : openai.py
 """
 import asyncio
-import time
 from typing import NamedTuple
 
 import openai
@@ -15,6 +14,9 @@ from tenacity import retry, stop_after_attempt, after_log, wait_fixed, retry_if_
 from metagpt.config import CONFIG
 from metagpt.logs import logger
 from metagpt.provider.base_gpt_api import BaseGPTAPI
+from metagpt.provider.http_pool import get_aiohttp_session
+from metagpt.provider.llm_cache import LLMCache
+from metagpt.provider.rate_limiter import get_rate_limiter
 from metagpt.utils.singleton import Singleton
 from metagpt.utils.token_counter import (
     TOKEN_COSTS,
@@ -24,30 +26,6 @@ from metagpt.utils.token_counter import (
 )
 
 
-class RateLimiter:
-    """Rate control class, each call goes through wait_if_needed, sleep if rate control is needed"""
-
-    def __init__(self, rpm):
-        self.last_call_time = 0
-        # Here 1.1 is used because even if the calls are made strictly according to time,
-        # they will still be QOS'd; consider switching to simple error retry later
-        self.interval = 1.1 * 60 / rpm
-        self.rpm = rpm
-
-    def split_batches(self, batch):
-        return [batch[i : i + self.rpm] for i in range(0, len(batch), self.rpm)]
-
-    async def wait_if_needed(self, num_requests):
-        current_time = time.time()
-        elapsed_time = current_time - self.last_call_time
-
-        if elapsed_time < self.interval * num_requests:
-            remaining_time = self.interval * num_requests - elapsed_time
-            logger.info(f"sleep {remaining_time}")
-            await asyncio.sleep(remaining_time)
-
-        self.last_call_time = time.time()
-
 class Costs(NamedTuple):
     total_prompt_tokens: int
     total_completion_tokens: int
@@ -62,6 +40,8 @@ class CostManager(metaclass=Singleton):
         self.total_completion_tokens = 0
         self.total_cost = 0
         self.total_budget = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def update_cost(self, prompt_tokens, completion_tokens, model):
         """
@@ -100,18 +80,26 @@ class CostManager(metaclass=Singleton):
         """
         return self.total_completion_tokens
 
-def get_total_cost(self):
-    """
-    Get the total cost of API calls.
+    def get_total_cost(self):
+        """
+        Get the total cost of API calls.
 
-    Returns:
-    float: The total cost of API calls.
-    """
-    return self.total_cost
+        Returns:
+        float: The total cost of API calls.
+        """
+        return self.total_cost
 
-def get_costs(self) -> Costs:
-    """Get all costs"""
-    return Costs(self.total_prompt_tokens, self.total_completion_tokens, self.total_cost, self.total_budget)
+    def get_costs(self) -> Costs:
+        """Get all costs"""
+        return Costs(self.total_prompt_tokens, self.total_completion_tokens, self.total_cost, self.total_budget)
+
+    def update_cache_stats(self, hit: bool):
+        """Count a lookup of the LLM response cache"""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        logger.debug(f"LLM cache hits: {self.cache_hits}, misses: {self.cache_misses}")
 
 def log_and_reraise(retry_state):
     logger.error(f"Retry attempts exhausted. Last exception: {retry_state.outcome.exception()}")
@@ -131,18 +119,19 @@ See FAQ 5.8
     raise retry_state.outcome.exception()
 
 
-class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
+class OpenAIGPTAPI(BaseGPTAPI):
     """
     Check https://platform.openai.com/examples for examples
     """
 
-    def __init__(self):
+    def __init__(self, model: str = None):
         self.__init_openai(CONFIG)
         self.llm = openai
-        self.model = CONFIG.openai_api_model
+        self.model = model or CONFIG.openai_api_model
         self.auto_max_tokens = False
         self._cost_manager = CostManager()
-        RateLimiter.__init__(self, rpm=self.rpm)
+        self._cache = LLMCache() if CONFIG.llm_cache else None
+        self._rate_limiter = get_rate_limiter(self.model, CONFIG.deployment_name or CONFIG.deployment_id)
 
     def __init_openai(self, config):
         openai.api_key = config.openai_api_key
@@ -151,7 +140,6 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
         if config.openai_api_type:
             openai.api_type = config.openai_api_type
             openai.api_version = config.openai_api_version
-        self.rpm = int(config.get("RPM", 10))
 
     async def _achat_completion_stream(self, messages: list[dict]) -> str:
         retry_delay = 15 # Time in seconds to wait before retrying
@@ -159,6 +147,8 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
 
         for attempt in range(max_retries):
             try:
+                estimated = await self._acquire(messages)
+                openai.aiosession.set(get_aiohttp_session())
                 response = await openai.ChatCompletion.acreate(**self._cons_kwargs(messages), stream=True)
 
                 # create variables to collect the stream of chunks
@@ -178,6 +168,7 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
                 full_reply_content = "".join([m.get("content", "") for m in collected_messages])
                 usage = self._calc_usage(messages, full_reply_content)
                 self._update_costs(usage)
+                self._reconcile(estimated, usage)
                 return full_reply_content
             
             except RateLimitError as e:
@@ -210,10 +201,28 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
         return kwargs
 
     async def _achat_completion(self, messages: list[dict]) -> dict:
+        estimated = await self._acquire(messages)
+        openai.aiosession.set(get_aiohttp_session())
         rsp = await self.llm.ChatCompletion.acreate(**self._cons_kwargs(messages))
         self._update_costs(rsp.get("usage"))
+        self._reconcile(estimated, rsp.get("usage"))
         return rsp
 
+    async def _acquire(self, messages: list[dict]) -> int:
+        """Wait for the shared RPM/TPM budget, return the estimated tokens reserved for this request"""
+        try:
+            estimated = count_message_tokens(messages, self.model) + self.get_max_tokens(messages)
+        except Exception:
+            estimated = sum(len(i["content"]) for i in messages) // 4 + self.get_max_tokens(messages)
+        await self._rate_limiter.acquire(estimated)
+        return estimated
+
+    def _reconcile(self, estimated: int, usage: dict):
+        if not usage:
+            return
+        actual = int(usage.get("prompt_tokens", 0)) + int(usage.get("completion_tokens", 0))
+        self._rate_limiter.reconcile(estimated, actual)
+
     def _chat_completion(self, messages: list[dict]) -> dict:
         rsp = self.llm.ChatCompletion.create(**self._cons_kwargs(messages))
         self._update_costs(rsp)
@@ -238,11 +247,28 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
     )
     async def acompletion_text(self, messages: list[dict], stream=False) -> str:
         """when streaming, print each token in place."""
+        if not self._cache:
+            return await self._acompletion_text(messages, stream)
+
+        key = self._cache_key(messages)
+        rsp = self._cache.get(key)
+        self._cost_manager.update_cache_stats(hit=rsp is not None)
+        if rsp is None:
+            rsp = await self._acompletion_text(messages, stream)
+            self._cache.set(key, rsp)
+        return rsp
+
+    async def _acompletion_text(self, messages: list[dict], stream=False) -> str:
         if stream:
             return await self._achat_completion_stream(messages)
         rsp = await self._achat_completion(messages)
         return self.get_choice_text(rsp)
 
+    def _cache_key(self, messages: list[dict]) -> str:
+        kwargs = self._cons_kwargs(messages)
+        model = kwargs.get("model") or kwargs.get("engine") or kwargs.get("deployment_id")
+        return self._cache.make_key(model, messages, kwargs["temperature"], kwargs["max_tokens"])
+
     def _calc_usage(self, messages: list[dict], rsp: str) -> dict:
         usage = {}
         if CONFIG.calc_usage:
@@ -257,32 +283,6 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
         else:
             return usage
 
-    async def acompletion_batch(self, batch: list[list[dict]]) -> list[dict]:
-        """Return full JSON"""
-        split_batches = self.split_batches(batch)
-        all_results = []
-
-        for small_batch in split_batches:
-            logger.info(small_batch)
-            await self.wait_if_needed(len(small_batch))
-
-            future = [self.acompletion(prompt) for prompt in small_batch]
-            results = await asyncio.gather(*future)
-            logger.info(results)
-            all_results.extend(results)
-
-        return all_results
-
-    async def acompletion_batch_text(self, batch: list[list[dict]]) -> list[str]:
-        """Only return plain text"""
-        raw_results = await self.acompletion_batch(batch)
-        results = []
-        for idx, raw_result in enumerate(raw_results, start=1):
-            result = self.get_choice_text(raw_result)
-            results.append(result)
-            logger.info(f"Result of task {idx}: {result}")
-        return results
-
     def _update_costs(self, usage: dict):
         if CONFIG.calc_usage:
             try:
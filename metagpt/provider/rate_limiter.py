@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : process-wide token-bucket rate limiter of LLM requests and tokens
+
+import asyncio
+import time
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+
+
+class TokenBucket:
+    """Bucket holding up to `capacity` units, refilled continuously at `capacity` units per minute"""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.rate = capacity / 60
+        self.available = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds to wait until `amount` units are available"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float):
+        """Take `amount` units, a negative amount (over-reserved usage) gives units back"""
+        self._refill()
+        self.available = min(self.capacity, self.available - min(amount, self.capacity))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budget of one model/deployment, 0 means unlimited"""
+
+    def __init__(self, rpm: int, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, tokens: int = 0):
+        """Reserve one request and the estimated tokens, sleep until the budget allows it"""
+        while True:
+            # no await between checking and consuming, so concurrent coroutines can't overdraw the buckets
+            wait = 0
+            if self.requests:
+                wait = max(wait, self.requests.wait_time(1))
+            if self.tokens:
+                wait = max(wait, self.tokens.wait_time(tokens))
+            if not wait:
+                break
+            logger.info(f"Rate limit reached, sleep {wait:.2f}s")
+            await asyncio.sleep(wait)
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
+
+    def reconcile(self, estimated: int, actual: int):
+        """Correct the token bucket with the actual usage reported after the request"""
+        if self.tokens and actual:
+            self.tokens.consume(actual - estimated)
+
+
+_limiters: dict[tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(model: str, deployment: str = "") -> RateLimiter:
+    """Return the limiter shared by every LLM instance in the process using the same model/deployment"""
+    key = (model, deployment or "")
+    if key not in _limiters:
+        limits = (CONFIG.rate_limits or {}).get(deployment or model, {})
+        rpm = int(limits.get("rpm", CONFIG.openai_api_rpm))
+        tpm = int(limits.get("tpm", CONFIG.openai_api_tpm))
+        _limiters[key] = RateLimiter(rpm, tpm)
+    return _limiters[key]
@@ -1,12 +1,16 @@
 from pathlib import Path
 
+from metagpt.config import CONFIG
 from metagpt.const import WORKSPACE_ROOT
 from metagpt.logs import logger
+from metagpt.memory import ContextBuilder
 from metagpt.roles import Role
 from metagpt.actions import WriteCode, WriteCodeReview, WriteTasks, WriteDesign, BossRequirementFromDocuments
-from metagpt.schema import Message
+from metagpt.actions.write_code import PROMPT_TEMPLATE as WRITE_CODE_PROMPT
+from metagpt.schema import CodeBatch, CodeFile, Message
 from metagpt.utils.common import CodeParser
-from metagpt.utils.special_tokens import MSG_SEP, FILENAME_CODE_SEP
+from metagpt.utils.task_graph import TaskScheduler, parse_dependencies
+from metagpt.utils.token_counter import count_string_tokens
 
 class DataEngineer(Role):
     """
@@ -38,6 +42,7 @@ class DataEngineer(Role):
             self._init_actions([WriteCode, WriteCodeReview])
         self._watch([BossRequirementFromDocuments, WriteTasks])
         self.todos = []
+        self.dependencies = {}
         self.n_borg = n_borg
 
     async def _act(self) -> Message:
@@ -46,48 +51,84 @@ class DataEngineer(Role):
             return await self._act_sp_precision()
         return await self._act_sp()
     
-    async def _act_sp_precision(self) -> Message:
-        code_msg_all = [] # gather all code info, will pass to qa_engineer for tests later
+    def _context_builder(self) -> ContextBuilder:
+        """
+        # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
+        1. All from Architect
+        2. All from ProjectManager
+        3. Do we need other codes (currently needed)? The dependencies first, then the related ones, then the most
+           recent, as many as fit
+        TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
+        """
+        model = self._llm.model
+        return ContextBuilder(
+            self._rc.memory,
+            prefix_actions=[WriteDesign, WriteTasks, BossRequirementFromDocuments],
+            detail_actions=[WriteCode],
+            model=model,
+            reserved=CONFIG.max_tokens_rsp + count_string_tokens(WRITE_CODE_PROMPT, model),
+        )
+
+    @staticmethod
+    def _module_name(filename: str) -> str:
+        return Path(filename.replace('"', '').strip()).stem
+
+    async def _write_code(self, todo: str, context: str) -> str:
+        logger.debug("Current todo/filename is: {}".format(todo))
+        logger.debug("Given the following context: {}".format(context))
+        code = await WriteCode().run(
+            context=context,
+            filename=todo
+        )
+        # Code review
+        if self.use_code_review:
+            try:
+                rewrite_code = await WriteCodeReview().run(
+                    context=context,
+                    code=code,
+                    filename=todo
+                )
+                code = rewrite_code
+            except Exception as e:
+                logger.error("code review failed!", e)
+                pass
+        return code
+
+    async def _write_all(self, cause_by) -> CodeBatch:
+        """Write the files in dependency order, up to n_borg at once, each as soon as its dependencies are written
+
+        A file sees the code of its dependencies first, then the code written in earlier rounds, files are written and
+        memorized in task list order.
+        """
+        context_builder = self._context_builder()
+
+        async def _write(todo: str, deps: dict[str, Message]) -> Message:
+            context = context_builder.build(related=self._module_name(todo), first=deps.values())
+            code = await self._write_code(todo, context)
+            return Message(content=code, role=self.profile, cause_by=cause_by)
+
+        dependencies = {todo: self.dependencies.get(todo, set()) for todo in self.todos}
+        scheduler = TaskScheduler(dependencies, concurrency=self.n_borg)
+        msgs = await scheduler.run(_write)
+        if scheduler.failed or scheduler.cancelled:
+            logger.error(f"Failed to write {list(scheduler.failed)}, skipped {list(scheduler.cancelled)}")
+
+        code_batch = CodeBatch(files=[])  # gather all code info, will pass to qa_engineer for tests later
         for todo in self.todos:
-            """
-            # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
-            1. All from Architect
-            2. All from ProjectManager
-            3. Do we need other codes (currently needed)?
-            TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
-            """
-            context = []
-            msg = self._rc.memory.storage
-            for m in msg:
-                context.append(m.content)
-            context_str = "\n".join(context)
-            # Write code
-            code = await WriteCode().run(
-                context=context_str,
-                filename=todo
-            )
-            # Code review
-            if self.use_code_review:
-                try:
-                    rewrite_code = await WriteCodeReview().run(
-                        context=context_str,
-                        code=code,
-                        filename=todo
-                    )
-                    code = rewrite_code
-                except Exception as e:
-                    logger.error("code review failed!", e)
-                    pass
-            file_path = self.write_file(todo, code)
-            msg = Message(content=code, role=self.profile, cause_by=WriteCode)
-            self._rc.memory.add(msg)
-
-            code_msg = todo + FILENAME_CODE_SEP + str(file_path)
-            code_msg_all.append(code_msg)
+            if todo not in msgs:
+                continue
+            file_path = self.write_file(todo, msgs[todo].content)
+            self._rc.memory.add(msgs[todo])
+            code_batch.files.append(CodeFile(filename=todo, path=str(file_path)))
+        return code_batch
+
+    async def _act_sp_precision(self) -> Message:
+        code_batch = await self._write_all(cause_by=WriteCode)
 
         logger.info(f'Done {self.get_workspace()} generating.')
         msg = Message(
-            content=MSG_SEP.join(code_msg_all),
+            content=str(code_batch),
+            instruct_content=code_batch,
             role=self.profile,
             cause_by=type(self._rc.todo),
             send_to="QaEngineer"
@@ -95,28 +136,13 @@ class DataEngineer(Role):
         return msg
 
     async def _act_sp(self) -> Message:
-        code_msg_all = [] # gather all code info, will pass to qa_engineer for tests later
         logger.debug("The list of todos: {}".format(self.todos))
-        for todo in self.todos:
-            logger.debug("Current todo/filename is: {}".format(todo))
-            logger.debug("Given the following context: {}".format(self._rc.history))
-            code = await WriteCode().run(
-                context=self._rc.history,
-                filename=todo
-            )
-            # logger.info(todo)
-            # logger.info(code_rsp)
-            # code = self.parse_code(code_rsp)
-            file_path = self.write_file(todo, code)
-            msg = Message(content=code, role=self.profile, cause_by=type(self._rc.todo))
-            self._rc.memory.add(msg)
-
-            code_msg = todo + FILENAME_CODE_SEP + str(file_path)
-            code_msg_all.append(code_msg)
+        code_batch = await self._write_all(cause_by=type(self._rc.todo))
 
         logger.info(f'Done {self.get_workspace()} generating.')
         msg = Message(
-            content=MSG_SEP.join(code_msg_all),
+            content=str(code_batch),
+            instruct_content=code_batch,
             role=self.profile,
             cause_by=type(self._rc.todo),
             send_to="QaEngineer"
@@ -125,9 +151,12 @@ class DataEngineer(Role):
         return msg
     
     def recv(self, message: Message) -> None:
+        if message in self._rc.memory:
+            return
         self._rc.memory.add(message)
-        if message in self._rc.important_memory:
+        if message.cause_by in self._rc.watch:
             self.todos = self.parse_tasks(message)
+            self.dependencies = parse_dependencies(self.todos, self.parse_logic_analysis(message))
 
     @classmethod
     def parse_tasks(self, task_msg: Message) -> list[str]:
@@ -135,6 +164,15 @@ class DataEngineer(Role):
             return task_msg.instruct_content.dict().get("Task list")
         return CodeParser.parse_file_list(block="Task list", text=task_msg.content)
 
+    @classmethod
+    def parse_logic_analysis(cls, task_msg: Message) -> list:
+        if task_msg.instruct_content:
+            return task_msg.instruct_content.dict().get("Logic Analysis") or []
+        try:
+            return CodeParser.parse_file_list(block="Logic Analysis", text=task_msg.content)
+        except Exception:
+            return []
+
     def write_file(self, filename: str, code: str):
         workspace = self.get_workspace()
         filename = filename.replace('"', '').replace('\n', '')
@@ -155,8 +193,8 @@ class DataEngineer(Role):
             if not msg:
                 return WORKSPACE_ROOT / 'src'
         except IndexError:
-            logger.debug(f"memory: {self._rc.memory.storage}")
-            msg = self._rc.memory.storage[0]
+            logger.debug(f"memory: {self._rc.memory}")
+            msg = self._rc.memory.get()[0]
             logger.debug(f"msg: {msg}")
         workspace = self.parse_workspace(msg)
         # Codes are written in workspace/{package_name}/{package_name}
@@ -7,43 +7,15 @@
 """
 import asyncio
 import shutil
-from collections import OrderedDict
 from pathlib import Path
 
 from metagpt.const import WORKSPACE_ROOT
 from metagpt.logs import logger
 from metagpt.roles import Role
 from metagpt.actions import WriteCode, WriteCodeReview, WriteTasks, WriteDesign
-from metagpt.schema import Message
+from metagpt.schema import CodeBatch, CodeFile, Message
 from metagpt.utils.common import CodeParser
-from metagpt.utils.special_tokens import MSG_SEP, FILENAME_CODE_SEP
-
-
-async def gather_ordered_k(coros, k) -> list:
-    tasks = OrderedDict()
-    results = [None] * len(coros)
-    done_queue = asyncio.Queue()
-
-    for i, coro in enumerate(coros):
-        if len(tasks) >= k:
-            done, _ = await asyncio.wait(tasks.keys(), return_when=asyncio.FIRST_COMPLETED)
-            for task in done:
-                index = tasks.pop(task)
-                await done_queue.put((index, task.result()))
-        task = asyncio.create_task(coro)
-        tasks[task] = i
-
-    if tasks:
-        done, _ = await asyncio.wait(tasks.keys())
-        for task in done:
-            index = tasks[task]
-            await done_queue.put((index, task.result()))
-
-    while not done_queue.empty():
-        index, result = await done_queue.get()
-        results[index] = result
-
-    return results
+from metagpt.utils.task_graph import TaskScheduler, parse_dependencies
 
 
 class Engineer(Role):
@@ -57,6 +29,7 @@ class Engineer(Role):
         constraints (str): Constraints for the engineer.
         n_borg (int): Number of borgs.
         use_code_review (bool): Whether to use code review.
+        use_task_graph (bool): Whether to write up to n_borg files at once in the order of their dependencies.
         todos (list): List of tasks.
     """
     
@@ -66,7 +39,8 @@ class Engineer(Role):
                  goal: str = "Write elegant, readable, extensible, efficient code",
                  constraints: str = "The code should conform to standards like PEP8 and be modular and maintainable",
                  n_borg: int = 1, 
-                 use_code_review: bool = False) -> None:
+                 use_code_review: bool = False,
+                 use_task_graph: bool = False) -> None:
         """Initializes the Engineer role with given attributes."""
         super().__init__(name, profile, goal, constraints)
         self._init_actions([WriteCode])
@@ -75,7 +49,9 @@ class Engineer(Role):
             self._init_actions([WriteCode, WriteCodeReview])
         self._watch([WriteTasks])
         self.todos = []
+        self.dependencies = {}
         self.n_borg = n_borg
+        self.use_task_graph = use_task_graph
 
     @classmethod
     def parse_tasks(self, task_msg: Message) -> list[str]:
@@ -83,6 +59,15 @@ class Engineer(Role):
             return task_msg.instruct_content.dict().get("Task list")
         return CodeParser.parse_file_list(block="Task list", text=task_msg.content)
 
+    @classmethod
+    def parse_logic_analysis(cls, task_msg: Message) -> list:
+        if task_msg.instruct_content:
+            return task_msg.instruct_content.dict().get("Logic Analysis") or []
+        try:
+            return CodeParser.parse_file_list(block="Logic Analysis", text=task_msg.content)
+        except Exception:
+            return []
+
     @classmethod
     def parse_code(self, code_text: str) -> str:
         return CodeParser.parse_code(block="", text=code_text)
@@ -118,36 +103,48 @@ class Engineer(Role):
         return file
 
     def recv(self, message: Message) -> None:
+        if message in self._rc.memory:
+            return
         self._rc.memory.add(message)
-        if message in self._rc.important_memory:
+        if message.cause_by in self._rc.watch:
             self.todos = self.parse_tasks(message)
+            self.dependencies = parse_dependencies(self.todos, self.parse_logic_analysis(message))
 
     async def _act_mp(self) -> Message:
+        """Write up to n_borg files at once, each as soon as the files it depends on are written"""
         # self.recreate_workspace()
-        todo_coros = []
+        context = self._rc.memory.get_by_actions([WriteTasks, WriteDesign])
+
+        async def _write(todo: str, deps: dict[str, Message]) -> Message:
+            code = await WriteCode().run(context=context + list(deps.values()), filename=todo)
+            return Message(content=code, role=self.profile, cause_by=WriteCode)
+
+        dependencies = {todo: self.dependencies.get(todo, set()) for todo in self.todos}
+        scheduler = TaskScheduler(dependencies, concurrency=self.n_borg)
+        msgs = await scheduler.run(_write)
+        if scheduler.failed or scheduler.cancelled:
+            logger.error(f"Failed to write {list(scheduler.failed)}, skipped {list(scheduler.cancelled)}")
+
+        code_batch = CodeBatch(files=[])  # gather all code info, will pass to qa_engineer for tests later
         for todo in self.todos:
-            todo_coro = WriteCode().run(
-                context=self._rc.memory.get_by_actions([WriteTasks, WriteDesign]),
-                filename=todo
-            )
-            todo_coros.append(todo_coro)
-
-        rsps = await gather_ordered_k(todo_coros, self.n_borg)
-        for todo, code_rsp in zip(self.todos, rsps):
-            _ = self.parse_code(code_rsp)
-            logger.info(todo)
-            logger.info(code_rsp)
-            # self.write_file(todo, code)
-            msg = Message(content=code_rsp, role=self.profile, cause_by=type(self._rc.todo))
-            self._rc.memory.add(msg)
-            del self.todos[0]
+            if todo not in msgs:
+                continue
+            file_path = self.write_file(todo, msgs[todo].content)
+            self._rc.memory.add(msgs[todo])
+            code_batch.files.append(CodeFile(filename=todo, path=str(file_path)))
 
         logger.info(f'Done {self.get_workspace()} generating.')
-        msg = Message(content="all done.", role=self.profile, cause_by=type(self._rc.todo))
+        msg = Message(
+            content=str(code_batch),
+            instruct_content=code_batch,
+            role=self.profile,
+            cause_by=type(self._rc.todo),
+            send_to="QaEngineer"
+        )
         return msg
 
     async def _act_sp(self) -> Message:
-        code_msg_all = [] # gather all code info, will pass to qa_engineer for tests later
+        code_batch = CodeBatch(files=[]) # gather all code info, will pass to qa_engineer for tests later
         for todo in self.todos:
             code = await WriteCode().run(
                 context=self._rc.history,
@@ -160,12 +157,12 @@ class Engineer(Role):
             msg = Message(content=code, role=self.profile, cause_by=type(self._rc.todo))
             self._rc.memory.add(msg)
 
-            code_msg = todo + FILENAME_CODE_SEP + str(file_path)
-            code_msg_all.append(code_msg)
+            code_batch.files.append(CodeFile(filename=todo, path=str(file_path)))
 
         logger.info(f'Done {self.get_workspace()} generating.')
         msg = Message(
-            content=MSG_SEP.join(code_msg_all),
+            content=str(code_batch),
+            instruct_content=code_batch,
             role=self.profile,
             cause_by=type(self._rc.todo),
             send_to="QaEngineer"
@@ -173,7 +170,7 @@ class Engineer(Role):
         return msg
 
     async def _act_sp_precision(self) -> Message:
-        code_msg_all = [] # gather all code info, will pass to qa_engineer for tests later
+        code_batch = CodeBatch(files=[]) # gather all code info, will pass to qa_engineer for tests later
         for todo in self.todos:
             """
             # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
@@ -208,12 +205,12 @@ class Engineer(Role):
             msg = Message(content=code, role=self.profile, cause_by=WriteCode)
             self._rc.memory.add(msg)
 
-            code_msg = todo + FILENAME_CODE_SEP + str(file_path)
-            code_msg_all.append(code_msg)
+            code_batch.files.append(CodeFile(filename=todo, path=str(file_path)))
 
         logger.info(f'Done {self.get_workspace()} generating.')
         msg = Message(
-            content=MSG_SEP.join(code_msg_all),
+            content=str(code_batch),
+            instruct_content=code_batch,
             role=self.profile,
             cause_by=type(self._rc.todo),
             send_to="QaEngineer"
@@ -224,4 +221,6 @@ class Engineer(Role):
         """Determines the mode of action based on whether code review is used."""
         if self.use_code_review:
             return await self._act_sp_precision()
+        if self.use_task_graph:
+            return await self._act_mp()
         return await self._act_sp()
\ No newline at end of file
@@ -5,6 +5,7 @@
 @Author  : alexanderwu
 @File    : qa_engineer.py
 """
+import asyncio
 import os
 from pathlib import Path
 
@@ -12,9 +13,8 @@ from metagpt.actions import DebugError, RunCode, WriteCode, WriteDesign, WriteTe
 from metagpt.const import WORKSPACE_ROOT
 from metagpt.logs import logger
 from metagpt.roles import Role
-from metagpt.schema import Message
+from metagpt.schema import CodeBatch, FileInfo, Message, RunResult
 from metagpt.utils.common import CodeParser, parse_recipient
-from metagpt.utils.special_tokens import FILENAME_CODE_SEP, MSG_SEP
 
 
 class QaEngineer(Role):
@@ -58,11 +58,11 @@ class QaEngineer(Role):
         file.write_text(code)
 
     async def _write_test(self, message: Message) -> None:
-        code_msgs = message.content.split(MSG_SEP)
+        code_batch = CodeBatch.from_message(message)
         # result_msg_all = []
-        for code_msg in code_msgs:
+        for code_file in code_batch.files:
             # write tests
-            file_name, file_path = code_msg.split(FILENAME_CODE_SEP)
+            file_name, file_path = code_file.filename, code_file.path
             code_to_test = open(file_path, "r").read()
             if "test" in file_name:
                 continue  # Engineer might write some test files, skip testing a test file
@@ -80,15 +80,16 @@ class QaEngineer(Role):
 
             # prepare context for run tests in next round
             command = ["python", f"tests/{test_file_name}"]
-            file_info = {
-                "file_name": file_name,
-                "file_path": str(file_path),
-                "test_file_name": test_file_name,
-                "test_file_path": str(test_file_path),
-                "command": command,
-            }
+            file_info = FileInfo(
+                file_name=file_name,
+                file_path=str(file_path),
+                test_file_name=test_file_name,
+                test_file_path=str(test_file_path),
+                command=command,
+            )
             msg = Message(
                 content=str(file_info),
+                instruct_content=file_info,
                 role=self.profile,
                 cause_by=WriteTest,
                 sent_from=self.profile,
@@ -99,9 +100,9 @@ class QaEngineer(Role):
         logger.info(f"Done {self.get_workspace()}/tests generating.")
 
     async def _run_code(self, msg):
-        file_info = eval(msg.content)
-        development_file_path = file_info["file_path"]
-        test_file_path = file_info["test_file_path"]
+        file_info = FileInfo.from_message(msg)
+        development_file_path = file_info.file_path
+        test_file_path = file_info.test_file_path
         if not os.path.exists(development_file_path) or not os.path.exists(test_file_path):
             return
 
@@ -113,28 +114,40 @@ class QaEngineer(Role):
         result_msg = await RunCode().run(
             mode="script",
             code=development_code,
-            code_file_name=file_info["file_name"],
+            code_file_name=file_info.file_name,
             test_code=test_code,
-            test_file_name=file_info["test_file_name"],
-            command=file_info["command"],
+            test_file_name=file_info.test_file_name,
+            command=file_info.command,
             working_directory=proj_dir,  # workspace/package_name, will run tests/test_xxx.py here
             additional_python_paths=[development_code_dir],  # workspace/package_name/package_name,
             # import statement inside package code needs this
         )
 
         recipient = parse_recipient(result_msg)  # the recipient might be Engineer or myself
-        content = str(file_info) + FILENAME_CODE_SEP + result_msg
-        msg = Message(content=content, role=self.profile, cause_by=RunCode, sent_from=self.profile, send_to=recipient)
+        run_result = RunResult(file_info=file_info, result=result_msg)
+        msg = Message(
+            content=str(run_result),
+            instruct_content=run_result,
+            role=self.profile,
+            cause_by=RunCode,
+            sent_from=self.profile,
+            send_to=recipient,
+        )
         self._publish_message(msg)
 
     async def _debug_error(self, msg):
-        file_info, context = msg.content.split(FILENAME_CODE_SEP)
-        file_name, code = await DebugError().run(context)
+        run_result = RunResult.from_message(msg)
+        file_name, code = await DebugError().run(run_result.result)
         if file_name:
             self.write_file(file_name, code)
             recipient = msg.sent_from  # send back to the one who ran the code for another run, might be one's self
             msg = Message(
-                content=file_info, role=self.profile, cause_by=DebugError, sent_from=self.profile, send_to=recipient
+                content=str(run_result.file_info),
+                instruct_content=run_result.file_info,
+                role=self.profile,
+                cause_by=DebugError,
+                sent_from=self.profile,
+                send_to=recipient,
             )
             self._publish_message(msg)
 
@@ -145,6 +158,19 @@ class QaEngineer(Role):
         ]  # only relevant msgs count as observed news
         return len(self._rc.news)
 
+    async def _handle(self, msg: Message) -> None:
+        # Decide what to do based on observed msg type, currently defined by human,
+        # might potentially be moved to _think, that is, let the agent decides for itself
+        if msg.cause_by == WriteCode:
+            # engineer wrote a code, time to write a test for it
+            await self._write_test(msg)
+        elif msg.cause_by in [WriteTest, DebugError]:
+            # I wrote or debugged my test code, time to run it
+            await self._run_code(msg)
+        elif msg.cause_by == RunCode:
+            # I ran my test code, time to fix bugs, if any
+            await self._debug_error(msg)
+
     async def _act(self) -> Message:
         if self.test_round > self.test_round_allowed:
             result_msg = Message(
@@ -156,18 +182,8 @@ class QaEngineer(Role):
             )
             return result_msg
 
-        for msg in self._rc.news:
-            # Decide what to do based on observed msg type, currently defined by human,
-            # might potentially be moved to _think, that is, let the agent decides for itself
-            if msg.cause_by == WriteCode:
-                # engineer wrote a code, time to write a test for it
-                await self._write_test(msg)
-            elif msg.cause_by in [WriteTest, DebugError]:
-                # I wrote or debugged my test code, time to run it
-                await self._run_code(msg)
-            elif msg.cause_by == RunCode:
-                # I ran my test code, time to fix bugs, if any
-                await self._debug_error(msg)
+        # the news are about different files, handle them concurrently, the tests run in the shared process pool
+        await asyncio.gather(*(self._handle(msg) for msg in self._rc.news))
         self.test_round += 1
         result_msg = Message(
             content=f"Round {self.test_round} of tests done",
@@ -14,10 +14,11 @@ from pydantic import BaseModel, Field
 # from metagpt.environment import Environment
 from metagpt.config import CONFIG
 from metagpt.actions import Action, ActionOutput
-from metagpt.llm import LLM
+from metagpt.llm import get_llm
 from metagpt.logs import logger
 from metagpt.memory import Memory, LongTermMemory
 from metagpt.schema import Message
+from metagpt.utils.serialize import deserialize_message, serialize_message
 
 PREFIX_TEMPLATE = """You are a {profile}, named {name}, your goal is {goal}, and the constraint is {constraints}. """
 
@@ -71,6 +72,7 @@ class RoleContext(BaseModel):
     todo: Action = Field(default=None)
     watch: set[Type[Action]] = Field(default_factory=set)
     news: list[Type[Message]] = Field(default=[])
+    cursor: int = Field(default=0)  # high-water mark into env.history
 
     class Config:
         arbitrary_types_allowed = True
@@ -93,11 +95,22 @@ class RoleContext(BaseModel):
         return f"Memory: {self.memory}\nLongTermMemory: {self.long_term_memory}\nState: {self.state}Todo: {self.todo}\nWatch: {self.watch}\nNews: {self.news}"
 
 
+def _is_plain(value) -> bool:
+    """Whether the value is made of builtin containers and scalars only, and can be checkpointed as it is"""
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return True
+    if isinstance(value, dict):
+        return all(_is_plain(k) and _is_plain(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return all(_is_plain(i) for i in value)
+    return False
+
+
 class Role:
     """Role/Agent"""
 
     def __init__(self, name="", profile="", goal="", constraints="", desc=""):
-        self._llm = LLM()
+        self._llm = get_llm()
         self._setting = RoleSetting(name=name, profile=profile, goal=goal, constraints=constraints, desc=desc)
         self._states = []
         self._actions = []
@@ -124,6 +137,8 @@ class Role:
         self._rc.watch.update(actions)
         # check RoleContext after adding watch actions
         self._rc.check(self._role_id)
+        if self._rc.env:
+            self._rc.env.subscribe(self)
 
     def _set_state(self, state):
         """Update the current state."""
@@ -135,6 +150,23 @@ class Role:
         """Set the environment in which the role works. The role can talk to the environment and can also receive messages by observing."""
         self._rc.env = env
 
+    def dump_state(self) -> dict:
+        """The runtime state to checkpoint: the role context, and the public attributes of plain types, e.g. todos"""
+        return {
+            "state": self._rc.state,
+            "cursor": self._rc.cursor,
+            "memory": [serialize_message(i) for i in self._rc.memory.get()],
+            "attrs": {k: v for k, v in vars(self).items() if not k.startswith("_") and _is_plain(v)},
+        }
+
+    def load_state(self, state: dict):
+        """Restore the state of `dump_state`, the role continues from its last completed action"""
+        self._rc.memory.add_batch(deserialize_message(i) for i in state["memory"])
+        self._rc.cursor = state["cursor"]
+        if self._actions:
+            self._set_state(state["state"])
+        vars(self).update(state["attrs"])
+
     @property
     def profile(self):
         """Get the role description (position)"""
@@ -184,10 +216,11 @@ class Role:
         """Observe from the environment, obtain important information, and add it to memory"""
         if not self._rc.env:
             return 0
-        env_msgs = self._rc.env.memory.get()
+        env_msgs = self._rc.env.get_news(self._rc.cursor)
+        self._rc.cursor += len(env_msgs)
+
+        observed = [i for i in env_msgs if i.cause_by in self._rc.watch]
 
-        observed = self._rc.env.memory.get_by_actions(self._rc.watch)
-        
         self._rc.news = self._rc.memory.remember(observed)  # remember recent exact or similar memories
 
         for i in env_msgs:
@@ -215,7 +248,7 @@ class Role:
         """add message to history."""
         # self._history += f"\n{message}"
         # self._context = self._history
-        if message in self._rc.memory.get():
+        if message in self._rc.memory:
             return
         self._rc.memory.add(message)
 
@@ -7,12 +7,17 @@
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import ast
+import hashlib
+import sys
+import weakref
+from abc import ABC, abstractmethod
 from typing import Type, TypedDict
 
 from pydantic import BaseModel
 
 from metagpt.logs import logger
+from metagpt.utils.special_tokens import FILENAME_CODE_SEP, MSG_SEP
 
 
 class RawMessage(TypedDict):
@@ -20,19 +25,79 @@ class RawMessage(TypedDict):
     role: str
 
 
-@dataclass
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class Message:
-    """list[<role>: <content>]"""
-    content: str
-    instruct_content: BaseModel = field(default=None)
-    role: str = field(default='user')  # system / user / assistant
-    cause_by: Type["Action"] = field(default="")
-    sent_from: str = field(default="")
-    send_to: str = field(default="")
+    """list[<role>: <content>]
+
+    Immutable and slotted, role and cause_by are interned, the id and the rendered text are computed once.
+    Equal messages share one instance through `Message.intern`, so memories of different roles hold the same objects.
+    """
+    __slots__ = ("content", "instruct_content", "role", "cause_by", "sent_from", "send_to", "_id", "_str",
+                 "__weakref__")
+
+    def __init__(self, content: str, instruct_content: BaseModel = None, role: str = 'user',
+                 cause_by: Type["Action"] = "", sent_from: str = "", send_to: str = ""):
+        _set = object.__setattr__
+        _set(self, "content", content)
+        _set(self, "instruct_content", instruct_content)
+        _set(self, "role", _intern(role))  # system / user / assistant
+        _set(self, "cause_by", _intern(cause_by))
+        _set(self, "sent_from", _intern(sent_from))
+        _set(self, "send_to", _intern(send_to))
+        _set(self, "_id", None)
+        _set(self, "_str", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Message is immutable, use replace() to change {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError("Message is immutable")
+
+    def __reduce__(self):
+        return Message, (self.content, self.instruct_content, self.role, self.cause_by, self.sent_from, self.send_to)
+
+    def replace(self, **changes) -> "Message":
+        """Return a copy with some fields changed"""
+        fields = dict(content=self.content, instruct_content=self.instruct_content, role=self.role,
+                      cause_by=self.cause_by, sent_from=self.sent_from, send_to=self.send_to)
+        fields.update(changes)
+        return Message(**fields)
+
+    @property
+    def id(self) -> str:
+        """Stable content-addressed id, derived from role, cause_by, content and sent_from"""
+        if self._id is None:
+            cause_by = self.cause_by
+            if isinstance(cause_by, type):
+                cause_by = f"{cause_by.__module__}.{cause_by.__qualname__}"
+            key = "\0".join(str(i) for i in (self.role, cause_by, self.content, self.sent_from))
+            object.__setattr__(self, "_id", hashlib.sha1(key.encode("utf-8")).hexdigest())
+        return self._id
+
+    def intern(self) -> "Message":
+        """Return the shared instance of this message, registering it if it is the first one"""
+        shared = _messages.get(self.id)
+        if shared is None:
+            _messages[self.id] = shared = self
+        return shared if shared == self else self
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self.id == other.id and self.send_to == other.send_to and \
+            self.instruct_content == other.instruct_content
+
+    def __hash__(self):
+        return hash(self.id)
 
     def __str__(self):
         # prefix = '-'.join([self.role, str(self.cause_by)])
-        return f"{self.role}: {self.content}"
+        if self._str is None:
+            object.__setattr__(self, "_str", f"{self.role}: {self.content}")
+        return self._str
 
     def __repr__(self):
         return self.__str__()
@@ -44,31 +109,102 @@ class Message:
         }
 
 
-@dataclass
+# shared instances of the messages alive, by id
+_messages: "weakref.WeakValueDictionary[str, Message]" = weakref.WeakValueDictionary()
+
+
+class Payload(BaseModel, ABC):
+    """Typed `instruct_content` of a message, its str() is the message content"""
+
+    @classmethod
+    @abstractmethod
+    def parse(cls, text: str) -> "Payload":
+        """Build the payload back from the message content"""
+
+    @classmethod
+    def from_message(cls, msg: Message) -> "Payload":
+        """Return the payload of the message, parse the content only if it was sent without one"""
+        if isinstance(msg.instruct_content, cls):
+            return msg.instruct_content
+        return cls.parse(msg.content)
+
+
+class CodeFile(BaseModel):
+    filename: str
+    path: str
+
+
+class CodeBatch(Payload):
+    """Development files written in one round"""
+    files: list[CodeFile]
+
+    def __str__(self):
+        return MSG_SEP.join(i.filename + FILENAME_CODE_SEP + i.path for i in self.files)
+
+    @classmethod
+    def parse(cls, text: str) -> "CodeBatch":
+        files = [i.split(FILENAME_CODE_SEP) for i in text.split(MSG_SEP)]
+        return cls(files=[CodeFile(filename=filename, path=path) for filename, path in files])
+
+
+class FileInfo(Payload):
+    """A development file, its test file, and the command running the test"""
+    file_name: str
+    file_path: str
+    test_file_name: str
+    test_file_path: str
+    command: list[str]
+
+    def __str__(self):
+        return str(self.dict())
+
+    @classmethod
+    def parse(cls, text: str) -> "FileInfo":
+        return cls(**ast.literal_eval(text))
+
+
+class RunResult(Payload):
+    """The result of running the test of a file"""
+    file_info: FileInfo
+    result: str
+
+    def __str__(self):
+        return str(self.file_info) + FILENAME_CODE_SEP + self.result
+
+    @classmethod
+    def parse(cls, text: str) -> "RunResult":
+        file_info, result = text.split(FILENAME_CODE_SEP, 1)
+        return cls(file_info=FileInfo.parse(file_info), result=result)
+
+
 class UserMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
-        super().__init__(content, 'user')
+        super().__init__(content, role='user')
 
 
-@dataclass
 class SystemMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
-        super().__init__(content, 'system')
+        super().__init__(content, role='system')
 
 
-@dataclass
 class AIMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
-        super().__init__(content, 'assistant')
+        super().__init__(content, role='assistant')
 
 
 if __name__ == '__main__':
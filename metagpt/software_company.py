@@ -5,14 +5,27 @@
 @Author  : alexanderwu
 @File    : software_company.py
 """
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 from metagpt.actions import BossRequirement
 from metagpt.config import CONFIG
+from metagpt.const import CHECKPOINT_PATH, PASSES_PER_ROUND, TRANSCRIPT_PATH
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Role
 from metagpt.schema import Message
+from metagpt.utils.checkpoint import (
+    checkpoint_file,
+    dump_costs,
+    find_checkpoint,
+    load_checkpoint,
+    load_costs,
+    save_checkpoint,
+)
 from metagpt.utils.common import NoMoneyException
 
 
@@ -24,6 +37,8 @@ class SoftwareCompany(BaseModel):
     environment: Environment = Field(default_factory=Environment)
     investment: float = Field(default=10.0)
     idea: str = Field(default="")
+    checkpoint_dir: Path = Field(default=CHECKPOINT_PATH)
+    checkpoint_path: Optional[Path] = Field(default=None)  # named after the project when not given
 
     class Config:
         arbitrary_types_allowed = True
@@ -45,18 +60,40 @@ class SoftwareCompany(BaseModel):
     def start_project(self, idea):
         """Start a project from publishing boss requirement."""
         self.idea = idea
+        self.environment.history.stream_to(TRANSCRIPT_PATH / f"{datetime.now():%Y%m%d%H%M%S}.jsonl")
         self.environment.publish_message(Message(role="BOSS", content=idea, cause_by=BossRequirement))
 
     def _save(self):
-        logger.info(self.json())
+        """Checkpoint the messages, the roles and the costs, called after every pass of the environment"""
+        if not self.checkpoint_path:
+            self.checkpoint_path = checkpoint_file(self.checkpoint_dir, "software_company", self.idea)
+        state = {"idea": self.idea, "environment": self.environment.dump_state(), "costs": dump_costs()}
+        save_checkpoint(self.checkpoint_path, state)
+        logger.debug(f"Checkpoint saved to {self.checkpoint_path}")
+
+    def resume(self, idea: str = ""):
+        """Resume the project of `idea`, or of the last checkpoint, instead of starting one, the roles must be hired
+        the same way
+
+        Raises:
+            FileNotFoundError: If there is no checkpoint to resume.
+        """
+        if not self.checkpoint_path:
+            self.checkpoint_path = find_checkpoint(self.checkpoint_dir, "software_company", idea)
+        state = load_checkpoint(self.checkpoint_path)
+        self.idea = state["idea"]
+        load_costs(state["costs"])
+        self.environment.load_state(state["environment"])
+        self.environment.history.stream_to(TRANSCRIPT_PATH / f"{datetime.now():%Y%m%d%H%M%S}.jsonl")
+        logger.info(f"Resumed from {self.checkpoint_path}, pending roles: {self.environment.pending}")
+
+    def _on_pass(self):
+        self._save()
+        self._check_balance()
 
     async def run(self, n_round=3):
-        """Run company until target round or no money"""
-        while n_round > 0:
-            # self._save()
-            n_round -= 1
-            logger.debug(f"{n_round=}")
-            self._check_balance()
-            await self.environment.run()
+        """Run company until target round or no money, a round is up to PASSES_PER_ROUND passes of the roles woken
+        by new messages"""
+        self._check_balance()
+        await self.environment.run(k=n_round * PASSES_PER_ROUND, on_pass=self._on_pass)
         return self.environment.history
-    
\ No newline at end of file
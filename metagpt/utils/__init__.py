@@ -12,6 +12,7 @@ from metagpt.utils.token_counter import (
     TOKEN_COSTS,
     count_message_tokens,
     count_string_tokens,
+    count_strings_tokens,
 )
 
 
@@ -21,4 +22,5 @@ __all__ = [
     "TOKEN_COSTS",
     "count_message_tokens",
     "count_string_tokens",
+    "count_strings_tokens",
 ]
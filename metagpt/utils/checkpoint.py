@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : checkpoint of a company run on disk, to resume it without paying again for the completed actions
+
+import hashlib
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.provider.openai_api import CostManager
+
+
+def checkpoint_file(directory: Path, prefix: str, project: str) -> Path:
+    """The checkpoint of a project, named after it so that projects don't overwrite each other's"""
+    slug = re.sub(r"\W+", "_", project).strip("_")[:32]
+    return directory / f"{prefix}_{slug}_{hashlib.sha1(project.encode('utf-8')).hexdigest()[:8]}.pkl"
+
+
+def find_checkpoint(directory: Path, prefix: str, project: str = "") -> Path:
+    """The checkpoint of `project`, or the last saved one when it is empty
+
+    Raises:
+        FileNotFoundError: If there is no such checkpoint.
+    """
+    if project:
+        path = checkpoint_file(directory, prefix, project)
+        found: Optional[Path] = path if path.exists() else None
+    else:
+        found = max(directory.glob(f"{prefix}_*.pkl"), key=lambda i: i.stat().st_mtime, default=None)
+    if not found:
+        raise FileNotFoundError(f"No checkpoint to resume{f' for {project!r}' if project else ''} in {directory}")
+    return found
+
+
+def save_checkpoint(path: Path, state: dict):
+    """Pickle `state` into `path`, through a temporary file so that a crash while saving keeps the last checkpoint"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        raise FileNotFoundError(f"No checkpoint to resume at {path}")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def dump_costs() -> dict:
+    """The totals of the CostManager"""
+    return dict(vars(CostManager()))
+
+
+def load_costs(costs: dict):
+    manager = CostManager()
+    vars(manager).update(costs)
+    CONFIG.total_cost = manager.total_cost
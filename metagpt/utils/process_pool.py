@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : bounded pool of sandboxed subprocesses, with resource limits and capped output
+
+import asyncio
+import os
+import signal
+import weakref
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRUNCATED = "\n...[truncated]"
+
+
+class ProcessPool:
+    """
+    Run commands with at most `workers` processes at once, without blocking the event loop
+    - `timeout` seconds of wall time, after which the whole process group is killed
+    - `cpu_limit` seconds of CPU time and `memory_limit` MB of address space, applied with rlimits on POSIX, 0 means no limit
+    - at most `max_output` bytes of stdout and of stderr are kept, the rest is read and discarded
+    """
+
+    def __init__(self, workers: int = 4, timeout: float = 10, cpu_limit: int = 0, memory_limit: int = 0,
+                 max_output: int = 1024 * 1024):
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.max_output = max_output
+        # a semaphore is bound to the event loop it is first used in
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.workers)
+        return self._semaphores[loop]
+
+    def _set_limits(self):
+        """Run in the child process before exec"""
+        if self.cpu_limit:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_limit, self.cpu_limit))
+        if self.memory_limit:
+            size = self.memory_limit * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (size, size))
+
+    async def _read(self, stream: asyncio.StreamReader) -> str:
+        chunks, size, truncated = [], 0, False
+        while chunk := await stream.read(65536):
+            if size < self.max_output:
+                chunks.append(chunk[:self.max_output - size])
+                truncated = truncated or len(chunk) > self.max_output - size
+            else:
+                truncated = True
+            size += len(chunk)
+        text = b"".join(chunks).decode("utf-8", "replace")
+        return text + TRUNCATED if truncated else text
+
+    def _kill(self, process: asyncio.subprocess.Process):
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    async def run(self, command: list[str], cwd: str = None, env: dict = None,
+                  timeout: Optional[float] = None) -> tuple[str, str, Optional[int]]:
+        """Return (stdout, stderr, return code), the return code is None if the command timed out"""
+        timeout = self.timeout if timeout is None else timeout
+        posix = os.name == "posix"
+        async with self._semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=cwd,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=posix,
+                preexec_fn=self._set_limits if posix and resource and (self.cpu_limit or self.memory_limit) else None,
+            )
+            stdout = asyncio.ensure_future(self._read(process.stdout))
+            stderr = asyncio.ensure_future(self._read(process.stderr))
+            try:
+                returncode = await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.info("The command did not complete within the given timeout.")
+                returncode = None
+                self._kill(process)
+                await process.wait()
+            except asyncio.CancelledError:
+                self._kill(process)
+                raise
+            return await stdout, await stderr, returncode
+
+
+_pool: Optional[ProcessPool] = None
+
+
+def get_process_pool() -> ProcessPool:
+    """Return the pool shared by every RunCode of the process, configured by RUN_CODE_* settings"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPool(
+            workers=CONFIG.run_code_workers,
+            timeout=CONFIG.run_code_timeout,
+            cpu_limit=CONFIG.run_code_cpu_limit,
+            memory_limit=CONFIG.run_code_memory_limit,
+            max_output=CONFIG.run_code_max_output,
+        )
+    return _pool
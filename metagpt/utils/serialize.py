@@ -7,7 +7,7 @@ import pickle
 from typing import Dict, List, Tuple
 
 from metagpt.actions.action_output import ActionOutput
-from metagpt.schema import Message
+from metagpt.schema import Message, Payload
 
 
 def actionoutout_schema_to_mapping(schema: Dict) -> Dict:
@@ -43,25 +43,28 @@ def actionoutout_schema_to_mapping(schema: Dict) -> Dict:
 
 
 def serialize_message(message: Message):
-    message_cp = copy.deepcopy(message)  # avoid `instruct_content` value update by reference
-    ic = message_cp.instruct_content
-    if ic:
+    ic = message.instruct_content
+    if ic and not isinstance(ic, Payload):
+        # payloads are module level models and pickle as they are
         # model create by pydantic create_model like `pydantic.main.prd`, can't pickle.dump directly
         schema = ic.schema()
         mapping = actionoutout_schema_to_mapping(schema)
 
-        message_cp.instruct_content = {"class": schema["title"], "mapping": mapping, "value": ic.dict()}
-    msg_ser = pickle.dumps(message_cp)
+        # messages are immutable, the original keeps its `instruct_content`
+        message = message.replace(
+            instruct_content={"class": schema["title"], "mapping": mapping, "value": copy.deepcopy(ic.dict())}
+        )
+    msg_ser = pickle.dumps(message)
 
     return msg_ser
 
 
 def deserialize_message(message_ser: str) -> Message:
     message = pickle.loads(message_ser)
-    if message.instruct_content:
+    if message.instruct_content and not isinstance(message.instruct_content, Payload):
         ic = message.instruct_content
         ic_obj = ActionOutput.create_model_class(class_name=ic["class"], mapping=ic["mapping"])
         ic_new = ic_obj(**ic["value"])
-        message.instruct_content = ic_new
+        message = message.replace(instruct_content=ic_new)
 
     return message
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : dependency DAG of the files of a task list, from the "Logic Analysis" of WriteTasks, and its scheduler
+
+import asyncio
+import re
+from collections import Counter, defaultdict
+from pathlib import PurePosixPath
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from metagpt.logs import logger
+
+
+def _clean(filename: str) -> str:
+    return filename.replace('"', '').replace("'", '').strip()
+
+
+def parse_dependencies(task_list: list[str], logic_analysis: Optional[Iterable] = None) -> dict[str, set[str]]:
+    """Return {file: files it depends on}, a file depends on the files named in its logic analysis
+
+    Args:
+        task_list: The files to write.
+        logic_analysis: [(filename, what is implemented in it)], as generated by WriteTasks.
+    """
+    deps = {i: set() for i in task_list}
+    names = {}
+    for i in task_list:
+        path = PurePosixPath(_clean(i))
+        names[i] = re.compile(rf"(?<![\w./]){re.escape(path.name)}\b|(?<![\w.]){re.escape(str(path))}\b")
+    by_name = {_clean(i): i for i in task_list}
+
+    for item in logic_analysis or []:
+        if not isinstance(item, (list, tuple)) or len(item) < 2:
+            continue
+        filename, analysis = _clean(str(item[0])), str(item[1])
+        task = by_name.get(filename) or next((i for i in task_list if PurePosixPath(_clean(i)).name == filename), None)
+        if task is None:
+            continue
+        deps[task] |= {i for i, pattern in names.items() if i != task and pattern.search(analysis)}
+    return deps
+
+
+class TaskScheduler:
+    """
+    Run one task per node of a dependency DAG, up to `concurrency` at once
+    - a node starts as soon as all its dependencies are done, so the latency is the one of the critical path
+    - a node gets the results of its own dependencies only
+    - a failed node is retried `max_retries` times, then it and its dependents are cancelled
+    - nodes in a dependency cycle are started one at a time, in the task list order, once nothing else can run
+    """
+
+    def __init__(self, dependencies: dict[str, set[str]], concurrency: int = 1, max_retries: int = 1):
+        self.dependencies = {k: {i for i in v if i in dependencies and i != k} for k, v in dependencies.items()}
+        self.dependents = defaultdict(set)
+        for k, v in self.dependencies.items():
+            for i in v:
+                self.dependents[i].add(k)
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+        self.results: dict[str, Any] = {}
+        self.failed: dict[str, BaseException] = {}
+        self.cancelled: set[str] = set()
+        self._running: dict[asyncio.Task, str] = {}
+
+    def cancel(self, node: str):
+        """Cancel the node, running or not, and everything depending on it"""
+        stack = [node]
+        while stack:
+            i = stack.pop()
+            if i in self.cancelled or i in self.results:
+                continue
+            self.cancelled.add(i)
+            stack.extend(self.dependents[i])
+        for task, i in self._running.items():
+            if i in self.cancelled:
+                task.cancel()
+
+    async def run(self, func: Callable[[str, dict[str, Any]], Awaitable[Any]]) -> dict[str, Any]:
+        """Call `func(node, {dependency: result})` for every node, return {node: result} of the succeeded ones"""
+        pending = list(self.dependencies)
+        attempts = Counter()
+        try:
+            while True:
+                pending = [i for i in pending if i not in self.cancelled]
+                ready = [i for i in pending if self.dependencies[i] <= self.results.keys()]
+                if not ready and not self._running and pending:
+                    logger.warning(f"Dependency cycle between {pending}, starting {pending[0]}")
+                    ready = pending[:1]
+                for node in ready[:self.concurrency - len(self._running)]:
+                    pending.remove(node)
+                    deps = {i: self.results[i] for i in self.dependencies[node] if i in self.results}
+                    self._running[asyncio.ensure_future(func(node, deps))] = node
+                if not self._running:
+                    break
+
+                done, _ = await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = self._running.pop(task)
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        self.results[node] = task.result()
+                    elif attempts[node] < self.max_retries:
+                        attempts[node] += 1
+                        logger.warning(f"{node} failed, retry {attempts[node]}/{self.max_retries}: {task.exception()}")
+                        pending.insert(0, node)
+                    else:
+                        logger.error(f"{node} failed, cancel it and its dependents: {task.exception()}")
+                        self.failed[node] = task.exception()
+                        self.cancel(node)
+        finally:
+            for task in self._running:
+                task.cancel()
+        return self.results
@@ -1,6 +1,17 @@
-from typing import Generator, Sequence
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Generator, Optional, Sequence, TypeVar
 
-from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens
+from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens, get_encoding
+
+T = TypeVar("T")
+
+# chunk boundaries from the most to the least preferred: (separators, whether the chunk ends after them)
+_BOUNDARIES = (
+    ((b"\n",), True),
+    (tuple(i.encode("utf-8") for i in ".!?;。！？；"), True),
+    ((b" ", b"\t"), False),
+)
 
 
 def reduce_message_length(msgs: Generator[str, None, None], model_name: str, system_text: str, reserved: int = 0,) -> str:
@@ -19,56 +30,137 @@ def reduce_message_length(msgs: Generator[str, None, None], model_name: str, sys
         RuntimeError: If it fails to reduce the concatenated message length.
     """
     max_token = TOKEN_MAX.get(model_name, 2048) - count_string_tokens(system_text, model_name) - reserved
-    for msg in msgs:
-        if count_string_tokens(msg, model_name) < max_token:
-            return msg
-
+    msgs = iter(msgs)
+    first = next(msgs, None)
+    if first is not None and count_string_tokens(first, model_name) < max_token:
+        return first
+
+    # the prompts get shorter, so binary search the first one fitting instead of tokenizing them all
+    rest = list(msgs)
+    lo, hi = 0, len(rest)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if count_string_tokens(rest[mid], model_name) < max_token:
+            hi = mid
+        else:
+            lo = mid + 1
+    if lo < len(rest):
+        return rest[lo]
     raise RuntimeError("fail to reduce message length")
 
 
+def fit_segments(
+    segments: Sequence[T],
+    render: Callable[[list[T]], str],
+    model_name: str,
+    system_text: str,
+    reserved: int = 0,
+    priorities: Optional[Sequence[float]] = None,
+) -> str:
+    """Render the prompt from as many segments as fit within the maximum token size, dropping the least important.
+
+    Args:
+        segments: The droppable segments.
+        render: Build the prompt from the kept segments, given in their original order.
+        model_name: The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+        system_text: The system prompts.
+        reserved: The number of reserved tokens.
+        priorities: The priority of every segment, higher is kept longer. Defaults to dropping from the end.
+
+    Returns:
+        The rendered prompt, found with O(log n) tokenizations.
+
+    Raises:
+        RuntimeError: If the prompt doesn't fit even without any segment.
+    """
+    max_token = TOKEN_MAX.get(model_name, 2048) - count_string_tokens(system_text, model_name) - reserved
+    if priorities is None:
+        priorities = [-i for i in range(len(segments))]
+    order = sorted(range(len(segments)), key=lambda i: -priorities[i])
+
+    def _render(k: int) -> str:
+        return render([segments[i] for i in sorted(order[:k])])
+
+    lo, hi = 0, len(segments)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_string_tokens(_render(mid), model_name) < max_token:
+            lo = mid
+        else:
+            hi = mid - 1
+    prompt = _render(lo)
+    if lo == 0 and count_string_tokens(prompt, model_name) >= max_token:
+        raise RuntimeError("fail to reduce message length")
+    return prompt
+
+
 def generate_prompt_chunk(
     text: str,
     prompt_template: str,
     model_name: str,
     system_text: str,
     reserved: int = 0,
+    overlap: int = 0,
 ) -> Generator[str, None, None]:
     """Split the text into chunks of a maximum token size.
 
+    The text is tokenized once, every chunk ends at the last line break that fits, or at the last sentence end,
+    or at the last word end if a single line is too long.
+
     Args:
         text: The text to split.
         prompt_template: The template for the prompt, containing a single `{}` placeholder. For example, "### Reference\n{}".
         model_name: The name of the encoding to use. (e.g., "gpt-3.5-turbo")
         system_text: The system prompts.
         reserved: The number of reserved tokens.
+        overlap: The number of tokens of a chunk repeated at the start of the next one.
 
     Yields:
         The chunk of text.
     """
-    paragraphs = text.splitlines(keepends=True)
-    current_token = 0
-    current_lines = []
-
     reserved = reserved + count_string_tokens(prompt_template+system_text, model_name)
     # 100 is a magic number to ensure the maximum context length is not exceeded
-    max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100  
-
-    while paragraphs:
-        paragraph = paragraphs.pop(0)
-        token = count_string_tokens(paragraph, model_name)
-        if current_token + token <= max_token:
-            current_lines.append(paragraph)
-            current_token += token
-        elif token > max_token:
-            paragraphs = split_paragraph(paragraph) + paragraphs
+    max_token = max(TOKEN_MAX.get(model_name, 2048) - reserved - 100, 1)
+
+    encoding = get_encoding(model_name)
+    token_bytes = [encoding.decode_single_token_bytes(i) for i in encoding.encode_ordinary(text)]
+    data = b"".join(token_bytes)
+    offsets = [0, *accumulate(len(i) for i in token_bytes)]
+
+    start, total = 0, len(token_bytes)
+    while start < total:
+        end = min(start + max_token, total)
+        if end < total:
+            end = _chunk_end(data, offsets, start, end)
+        yield prompt_template.format(data[offsets[start]:offsets[end]].decode("utf-8", "ignore"))
+        if end >= total:
+            break
+        start = _char_aligned(data, offsets, end - overlap, start + 1) if 0 < overlap < end - start else end
+
+
+def _chunk_end(data: bytes, offsets: list[int], start: int, end: int) -> int:
+    """Return the last token index in (start, end] ending a line, or else a sentence, or else a word"""
+    lower = offsets[start]
+    window = data[lower:offsets[end]]
+    for seps, after in _BOUNDARIES:
+        found = [window.rfind(i) + (len(i) if after else 0) for i in seps if i in window]
+        if not found:
             continue
-        else:
-            yield prompt_template.format("".join(current_lines))
-            current_lines = [paragraph]
-            current_token = token
+        cut = bisect_right(offsets, lower + max(found), start, end + 1) - 1
+        if cut > start:
+            return cut
+    return _char_aligned(data, offsets, end, start + 1)
+
+
+def _char_aligned(data: bytes, offsets: list[int], end: int, lower: int) -> int:
+    """Move the token index back until it doesn't cut a multi-byte character"""
+    while end > lower and _is_continuation(data, offsets[end]):
+        end -= 1
+    return end
+
 
-    if current_lines:
-        yield prompt_template.format("".join(current_lines))
+def _is_continuation(data: bytes, offset: int) -> bool:
+    return offset < len(data) and data[offset] & 0xC0 == 0x80
 
 
 def split_paragraph(paragraph: str, sep: str = ".,", count: int = 2) -> list[str]:
@@ -114,11 +206,8 @@ def _split_by_count(lst: Sequence , count: int):
 
 
 def _split_text_with_ends(text: str, sep: str = "."):
-    parts = []
-    for i in text:
-        parts.append(i)
-        if i == sep:
-            yield "".join(parts)
-            parts = []
-    if parts:
-        yield "".join(parts)
+    parts = text.split(sep)
+    for i in parts[:-1]:
+        yield i + sep
+    if parts[-1]:
+        yield parts[-1]
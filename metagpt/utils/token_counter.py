@@ -8,8 +8,15 @@ ref1: https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_
 ref2: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/token_counter.py
 ref3: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 """
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
 import tiktoken
 
+from metagpt.logs import logger
+
 TOKEN_COSTS = {
     "gpt-3.5-turbo": {"prompt": 0.0015, "completion": 0.002},
     "gpt-3.5-turbo-0301": {"prompt": 0.0015, "completion": 0.002},
@@ -22,6 +29,8 @@ TOKEN_COSTS = {
     "gpt-4-32k-0314": {"prompt": 0.06, "completion": 0.12},
     "gpt-4-0613": {"prompt": 0.06, "completion": 0.12},
     "text-embedding-ada-002": {"prompt": 0.0004, "completion": 0.0},
+    "claude-2": {"prompt": 0.01102, "completion": 0.03268},
+    "claude-instant-1": {"prompt": 0.00163, "completion": 0.00551},
 }
 
 
@@ -37,46 +46,101 @@ TOKEN_MAX = {
     "gpt-4-32k-0314": 32768,
     "gpt-4-0613": 8192,
     "text-embedding-ada-002": 8192,
+    "claude-2": 100000,
+    "claude-instant-1": 100000,
 }
 
 
-def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
-    """Return the number of tokens used by a list of messages."""
+# memoized counts of strings seen repeatedly, e.g. system prompts and templates
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+_MESSAGE_FORMATS = {
+    "gpt-3.5-turbo-0613": (3, 1),
+    "gpt-3.5-turbo-16k-0613": (3, 1),
+    "gpt-4-0314": (3, 1),
+    "gpt-4-32k-0314": (3, 1),
+    "gpt-4-0613": (3, 1),
+    "gpt-4-32k-0613": (3, 1),
+    # every message follows <|start|>{role/name}\n{content}<|end|>\n, if there's a name, the role is omitted
+    "gpt-3.5-turbo-0301": (4, -1),
+}
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Resolve the encoding of a model once, unknown models fall back to cl100k_base"""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model in {
-        "gpt-3.5-turbo-0613",
-        "gpt-3.5-turbo-16k-0613",
-        "gpt-4-0314",
-        "gpt-4-32k-0314",
-        "gpt-4-0613",
-        "gpt-4-32k-0613",
-    }:
-        tokens_per_message = 3
-        tokens_per_name = 1
-    elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        tokens_per_name = -1  # if there's a name, the role is omitted
-    elif "gpt-3.5-turbo" in model:
-        print("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613.")
-        return count_message_tokens(messages, model="gpt-3.5-turbo-0613")
-    elif "gpt-4" in model:
-        print("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return count_message_tokens(messages, model="gpt-4-0613")
-    else:
-        raise NotImplementedError(
-            f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
-        )
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
+        logger.warning(f"model {model} not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def _message_format(model: str) -> tuple[str, int, int]:
+    """Return (model counted as, tokens_per_message, tokens_per_name), warning once per model alias"""
+    if model in _MESSAGE_FORMATS:
+        return (model, *_MESSAGE_FORMATS[model])
+    if "gpt-3.5-turbo" in model:
+        logger.warning("gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613.")
+        return _message_format("gpt-3.5-turbo-0613")
+    if "gpt-4" in model:
+        logger.warning("gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
+        return _message_format("gpt-4-0613")
+    raise NotImplementedError(
+        f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
+    )
+
+
+class _TokenCountCache:
+    """LRU of (encoding name, sha1 of the string) -> number of tokens, the strings themselves are not kept"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+
+    @staticmethod
+    def _key(encoding: str, text: str) -> tuple[str, bytes]:
+        return encoding, hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest()
+
+    def get(self, encoding: str, text: str) -> Optional[int]:
+        key = self._key(encoding, text)
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def set(self, encoding: str, text: str, value: int):
+        key = self._key(encoding, text)
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+
+_token_count_cache = _TokenCountCache(TOKEN_COUNT_CACHE_SIZE)
+
+
+def count_strings_tokens(strings: list[str], model_name: str) -> list[int]:
+    """Return the number of tokens of every string, tokenizing the ones not memoized in one batch."""
+    encoding = get_encoding(model_name)
+    counts = [_token_count_cache.get(encoding.name, i) for i in strings]
+    missing = list({s: None for s, c in zip(strings, counts) if c is None})
+    if missing:
+        tokenized = encoding.encode_ordinary_batch(missing) if len(missing) > 1 else [encoding.encode_ordinary(missing[0])]
+        computed = {s: len(t) for s, t in zip(missing, tokenized)}
+        for s, c in computed.items():
+            _token_count_cache.set(encoding.name, s, c)
+        counts = [computed[s] if c is None else c for s, c in zip(strings, counts)]
+    return counts
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
+    """Return the number of tokens used by a list of messages."""
+    model, tokens_per_message, tokens_per_name = _message_format(model)
+    values = [value for message in messages for value in message.values()]
+    num_tokens = len(messages) * tokens_per_message + sum(count_strings_tokens(values, model))
+    num_tokens += tokens_per_name * sum("name" in message for message in messages)
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -92,8 +156,7 @@ def count_string_tokens(string: str, model_name: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    encoding = tiktoken.encoding_for_model(model_name)
-    return len(encoding.encode(string))
+    return count_strings_tokens([string], model_name)[0]
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
@@ -4,8 +4,10 @@ import asyncio
 import platform
 import fire
 
+from metagpt.logs import logger
 from metagpt.roles import Architect, Engineer, ProductManager
 from metagpt.roles import ProjectManager, QaEngineer
+from metagpt.provider.http_pool import close_aiohttp_session
 from metagpt.software_company import SoftwareCompany
 
 
@@ -15,9 +17,12 @@ async def startup(
     n_round: int = 5,
     code_review: bool = False,
     run_tests: bool = False,
-    implement: bool = True
+    implement: bool = True,
+    resume: bool = False
 ):
     """Run a startup. Be a boss."""
+    if not idea and not resume:
+        raise SystemExit("An idea is required, unless --resume is given")
     company = SoftwareCompany()
     company.hire([
         ProductManager(),
@@ -36,17 +41,26 @@ async def startup(
         company.hire([QaEngineer()])
 
     company.invest(investment)
-    company.start_project(idea)
+    if resume:
+        try:
+            company.resume(idea)
+        except FileNotFoundError as e:
+            logger.error(e)
+            raise SystemExit(1)
+    else:
+        company.start_project(idea)
     await company.run(n_round=n_round)
+    await close_aiohttp_session()
 
 
 def main(
-    idea: str,
+    idea: str = "",
     investment: float = 3.0,
     n_round: int = 5,
     code_review: bool = True,
     run_tests: bool = False,
-    implement: bool = True
+    implement: bool = True,
+    resume: bool = False
 ):
     """
     We are a software startup comprised of AI. By investing in us,
@@ -54,14 +68,16 @@ def main(
     :param idea: Your innovative idea, such as "Creating a snake game."
     :param investment: As an investor, you have the opportunity to contribute
     a certain dollar amount to this AI company.
-    :param n_round:
+    :param n_round: The maximum number of rounds, each of up to 4 passes of the roles woken by new messages.
     :param code_review: Whether to use code review.
+    :param resume: Continue the project of the idea, or the last checkpointed one when no idea is given, from its
+    checkpoint; hire the same team.
     :return:
     """
     if platform.system() == "Windows":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(startup(idea, investment, n_round,
-                code_review, run_tests, implement))
+                code_review, run_tests, implement, resume))
 
 
 if __name__ == '__main__':
@@ -69,3 +69,39 @@ async def test_run_failure():
         additional_python_paths=[],
     )
     assert "FAIL" in result
+
+
+@pytest.mark.asyncio
+async def test_run_cached(monkeypatch, tmp_path):
+    prompts = []
+
+    async def _aask(self, prompt, system_msgs=None):
+        prompts.append(prompt)
+        return "## Status:\nPASS"
+
+    monkeypatch.setattr(RunCode, "_aask", _aask)
+    (tmp_path / "util.py").write_text("VALUE = 1\n")
+    kwargs = dict(
+        mode="script",
+        code="from util import VALUE",
+        test_code="assert VALUE == 1",
+        command=["python", "-c", "from util import VALUE; assert VALUE == 1"],
+        working_directory=tmp_path,
+        additional_python_paths=[],
+    )
+
+    result = await RunCode().run(**kwargs)
+    assert await RunCode().run(**kwargs) == result
+    assert len(prompts) == 1
+
+    # any source the test may import invalidates the result
+    (tmp_path / "util.py").write_text("VALUE = 2\n")
+    await RunCode().run(**kwargs)
+    assert len(prompts) == 2
+
+
+def test_cache_key_needs_working_directory(tmp_path):
+    command = ["python", "test_util.py"]
+    assert RunCode._cache_key("script", "", "", command) is None
+    assert RunCode._cache_key("script", "", "", command, working_directory=tmp_path)
+    assert RunCode._cache_key("text", "result = 1", "", [])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/document_store/embedding_cache.py`
+
+import numpy as np
+
+from metagpt.document_store.embedding_cache import EmbeddingCache
+
+
+class _Embed:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[len(i), float(i[-1].isdigit())] for i in texts]
+
+
+def test_get_many(tmp_path):
+    embed = _Embed()
+    cache = EmbeddingCache(tmp_path)
+    vectors = cache.get_many(['a', 'bb', 'a'], embed)
+    assert vectors.tolist() == [[1, 0], [2, 0], [1, 0]]
+    assert embed.calls == [['a', 'bb']]
+
+    assert cache.get_many(['bb', 'ccc'], embed).tolist() == [[2, 0], [3, 0]]
+    assert embed.calls[-1] == ['ccc']
+
+    # the matrix and its keys are on disk
+    reopened = EmbeddingCache(tmp_path)
+    assert len(reopened) == 3
+    assert reopened.get_many(['ccc', 'a'], embed).dtype == np.float32
+    assert len(embed.calls) == 2
+
+
+def test_lru(tmp_path):
+    embed = _Embed()
+    cache = EmbeddingCache(tmp_path, max_entries=2)
+    cache.get_many(['x1', 'x2'], embed)
+    cache.get_many(['x1'], embed)  # x2 is now the least recently used
+    cache.get_many(['x3'], embed)
+    assert len(cache) == 2 and cache.capacity == 2
+
+    cache.get_many(['x1', 'x3'], embed)
+    assert len(embed.calls) == 2
+    cache.get_many(['x2'], embed)
+    assert embed.calls[-1] == ['x2']
+
+
+def test_interrupted_write(tmp_path):
+    embed = _Embed()
+    EmbeddingCache(tmp_path).get_many(['a'], embed)
+    assert (tmp_path / 'meta.json').exists()
+
+    (tmp_path / 'vectors.f32').unlink()
+    cache = EmbeddingCache(tmp_path)  # missing data, an empty cache
+    assert len(cache) == 0
+    assert cache.get_many(['a'], embed).tolist() == [[1, 0]]
+
+    (tmp_path / 'meta.json').unlink()  # data files written, metadata not yet
+    cache = EmbeddingCache(tmp_path)
+    assert len(cache) == 0 and not (tmp_path / 'keys.u8').exists()
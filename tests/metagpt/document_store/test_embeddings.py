@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/document_store/embeddings.py`
+
+import numpy as np
+from langchain.vectorstores import FAISS
+
+from metagpt.config import CONFIG
+from metagpt.document_store.embeddings import HashingEmbeddings, get_embeddings
+
+
+def test_hashing_embeddings():
+    embeddings = HashingEmbeddings(dim=64)
+    texts = ['Write a cli snake game', 'Write a game of cli snake', 'Write a 2048 web game', '']
+    vectors = np.array(embeddings.embed_documents(texts))
+    assert vectors.shape == (4, 64)
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1) and not vectors[3].any()
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+    assert embeddings.embed_query(texts[1]) == vectors[1].tolist()
+
+
+def test_local_backend(monkeypatch):
+    monkeypatch.setattr(CONFIG, 'embedding_backend', 'local')
+    embeddings = get_embeddings()
+    assert isinstance(embeddings, HashingEmbeddings)
+
+    store = FAISS.from_texts(['Oily Skin Facial Cleanser', 'Dry Skin Moisturizer', 'Snake game'], embeddings)
+    assert store.similarity_search('facial cleanser for oily skin', k=1)[0].page_content == 'Oily Skin Facial Cleanser'
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/document_store/faiss_index.py`
+
+import faiss
+import numpy as np
+import pytest
+
+from metagpt.actions import BossRequirement
+from metagpt.document_store.embeddings import HashingEmbeddings
+from metagpt.document_store.faiss_index import FaissIndexConfig, build_index
+from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.schema import Message
+
+
+@pytest.mark.parametrize(
+    ("index_type", "index_class"),
+    [("flat", faiss.IndexFlatL2), ("ivf_flat", faiss.IndexIVFFlat), ("ivf_pq", faiss.IndexIVFPQ),
+     ("hnsw", faiss.IndexHNSWFlat)],
+)
+def test_build_index(index_type, index_class):
+    vectors = np.random.default_rng(0).standard_normal((3000, 16)).astype(np.float32)
+    index = build_index(vectors, FaissIndexConfig(type=index_type, nlist=8, nprobe=8, pq_m=8, pq_nbits=6))
+    assert isinstance(index, index_class) and index.ntotal == 3000
+    _, ids = index.search(vectors[:20] + 0.001, 1)
+    assert (ids[:, 0] == np.arange(20)).mean() >= 0.9
+
+
+def test_build_index_fallback():
+    vectors = np.random.default_rng(0).standard_normal((100, 16)).astype(np.float32)
+    assert type(build_index(vectors, FaissIndexConfig(type="ivf_pq"))) is faiss.IndexFlatL2
+    assert type(build_index(vectors, FaissIndexConfig(type="ivf_flat", nlist=4))) is faiss.IndexFlatL2  # 39 per list
+    with pytest.raises(ValueError):
+        build_index(vectors, FaissIndexConfig(type="lsh"))
+
+
+def test_min_train_size():
+    assert FaissIndexConfig(type="ivf_flat", nlist=16).min_train_size(16) == 624
+    assert FaissIndexConfig(type="ivf_flat").min_train_size(10000) == 39 * 400
+    assert FaissIndexConfig(type="ivf_pq", nlist=16).min_train_size(16) == 39 * 256
+    assert FaissIndexConfig(type="hnsw").min_train_size(16) == 0
+
+
+def test_memory_storage_rebuild(monkeypatch):
+    monkeypatch.setattr(MemoryStorage, '_embeddings', lambda self: HashingEmbeddings())
+    memory_storage = MemoryStorage(flush_size=1000, index_config=FaissIndexConfig(type="ivf_flat", nlist=2))
+    memory_storage.recover_memory('UTUser5(Architect)')
+    memory_storage.clean()
+    for i in range(40):
+        memory_storage.add(Message(role='BOSS', content=f'Write a {i} game', cause_by=BossRequirement))
+    memory_storage.flush()
+    assert type(memory_storage.store.index) is faiss.IndexFlatL2  # too few to train 2 lists
+
+    for i in range(40, 80):
+        memory_storage.add(Message(role='BOSS', content=f'Write a {i} game', cause_by=BossRequirement))
+    memory_storage.flush()
+    index = memory_storage.store.index
+    assert isinstance(index, faiss.IndexIVFFlat) and index.ntotal == 80
+
+    for i in range(80, 120):
+        memory_storage.add(Message(role='BOSS', content=f'Write a {i} game', cause_by=BossRequirement))
+    memory_storage.flush()
+    assert memory_storage.store.index is index  # trained on 80, not retrained before 160
+
+    for i in range(120, 160):
+        memory_storage.add(Message(role='BOSS', content=f'Write a {i} game', cause_by=BossRequirement))
+    memory_storage.flush()
+    assert memory_storage.store.index is not index and memory_storage.store.index.ntotal == 160
+    assert memory_storage.search_many([Message(role='BOSS', content='Design a todo app')], k=1)[0]
+    memory_storage.clean()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/memory/context_builder.py`
+
+from metagpt.actions import WriteCode, WriteDesign, WriteTasks
+from metagpt.memory import ContextBuilder, Memory, context_builder
+from metagpt.schema import Message
+
+
+def _memory() -> Memory:
+    memory = Memory()
+    memory.add(Message(role='Project Manager', content='tasks: main.py, game.py', cause_by=WriteTasks))
+    memory.add(Message(role='Architect', content='design of snake game', cause_by=WriteDesign))
+    memory.add(Message(role='Engineer', content='import game\n' + 'x = 1\n' * 300, cause_by=WriteCode))
+    memory.add(Message(role='Engineer', content='class Snake: ...\n' * 300, cause_by=WriteCode))
+    return memory
+
+
+def test_context_builder_priority():
+    builder = ContextBuilder(_memory(), [WriteDesign, WriteTasks], [WriteCode], 'gpt-3.5-turbo')
+    context = builder.build(related='game')
+    assert context.index('design of snake game') < context.index('tasks: main.py') < context.index('import game')
+    assert 'class Snake' in context
+
+
+def test_context_builder_budget():
+    memory = _memory()
+    # room for the design, the tasks and a single code file
+    builder = ContextBuilder(memory, [WriteDesign, WriteTasks], [WriteCode], 'gpt-3.5-turbo', reserved=4096 - 2000)
+    assert 'import game' in builder.build(related='game')
+    assert 'class Snake' in builder.build()
+    assert builder._prefix_key == tuple(i.id for i in memory.get_by_actions([WriteDesign, WriteTasks]))
+
+
+def test_context_builder_first(monkeypatch):
+    # a token per line
+    monkeypatch.setattr(context_builder, 'count_strings_tokens', lambda texts, model: [i.count('\n') for i in texts])
+    memory = _memory()
+    dependency = Message(role='Engineer', content='def move(): ...\n' * 300, cause_by=WriteCode)
+    # room for the design, the tasks and two code files
+    builder = ContextBuilder(memory, [WriteDesign, WriteTasks], [WriteCode], 'gpt-3.5-turbo', reserved=4096 - 650)
+    context = builder.build(related='game', first=[dependency])
+    assert context.index('def move') < context.index('import game')
+    assert 'class Snake' not in context
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/memory/memory.py`
+
+from metagpt.actions import BossRequirement, WritePRD
+from metagpt.memory import Memory
+from metagpt.schema import Message
+
+
+def test_memory_dedup_and_indexes():
+    memory = Memory()
+    idea = Message(role='BOSS', content='Write a cli snake game', cause_by=BossRequirement)
+    prd = Message(role='Product Manager', content='PRD of snake game', cause_by=WritePRD)
+
+    memory.add_batch([idea, prd, Message(role='BOSS', content='Write a cli snake game', cause_by=BossRequirement)])
+    assert memory.count() == 2
+    assert idea in memory
+    assert memory.get() == [idea, prd]
+    assert memory.get(1) == [prd]
+    assert memory.get_by_role('BOSS') == [idea]
+    assert memory.get_by_action(WritePRD) == [prd]
+    assert memory.get_by_actions([WritePRD, BossRequirement]) == [prd, idea]
+
+    memory.delete(idea)
+    assert idea not in memory
+    assert memory.get_by_role('BOSS') == []
+    assert memory.get_by_action(BossRequirement) == []
+
+
+def test_memory_remember():
+    memory = Memory()
+    old = Message(role='BOSS', content='old', cause_by=BossRequirement)
+    new = Message(role='BOSS', content='new', cause_by=BossRequirement)
+    memory.add(old)
+
+    assert memory.remember([old, new]) == [new]
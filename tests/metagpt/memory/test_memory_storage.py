@@ -4,6 +4,9 @@
 
 from typing import List
 
+from langchain.embeddings import FakeEmbeddings
+
+from metagpt.document_store.embeddings import HashingEmbeddings
 from metagpt.memory.memory_storage import MemoryStorage
 from metagpt.schema import Message
 from metagpt.actions import BossRequirement
@@ -80,3 +83,59 @@ def test_actionout_message():
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+def test_write_behind(monkeypatch):
+    persisted = []
+    monkeypatch.setattr(MemoryStorage, '_embeddings', lambda self: FakeEmbeddings(size=8))
+    monkeypatch.setattr(MemoryStorage, 'persist', lambda self: persisted.append(len(self.store.docstore._dict)))
+
+    role_id = 'UTUser3(Engineer)'
+    memory_storage = MemoryStorage(flush_size=3)
+    memory_storage.recover_memory(role_id)
+    memory_storage.clean()
+    messages = [Message(role='BOSS', content=f'idea {i}', cause_by=BossRequirement) for i in range(4)]
+    for message in messages[:2]:
+        memory_storage.add(message)
+    assert persisted == [] and memory_storage.store is None
+
+    # un-flushed messages survive a crash through the log
+    recovered = MemoryStorage(flush_size=3).recover_memory(role_id)
+    assert [i.content for i in recovered] == ['idea 0', 'idea 1']
+
+    memory_storage.search(messages[0])  # the buffer is embedded in one batch, the files are not rewritten
+    assert len(memory_storage.store.docstore._dict) == 2 and persisted == []
+    memory_storage.add(messages[2])
+    assert persisted == [3]
+    memory_storage.add(messages[3])
+    memory_storage.flush()
+    assert persisted == [3, 4]
+    memory_storage.clean()
+
+
+class _CountingEmbeddings(HashingEmbeddings):
+    calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        return super().embed_documents(texts)
+
+
+def test_search_many(monkeypatch):
+    calls = _CountingEmbeddings.calls
+    monkeypatch.setattr(MemoryStorage, '_embeddings', lambda self: _CountingEmbeddings())
+    memory_storage = MemoryStorage()
+    memory_storage.recover_memory('UTUser4(Product Manager)')
+    memory_storage.clean()
+    memory_storage.threshold = 0.5
+    memory_storage.add(Message(role='BOSS', content='Write a cli snake game', cause_by=BossRequirement))
+
+    queries = [Message(role='BOSS', content=i, cause_by=BossRequirement)
+               for i in ['Write a cli snake game', 'Write a 2048 web game', 'Design a todo app']]
+    memory_storage.flush()
+    calls.clear()
+    results = memory_storage.search_many(queries)
+    assert calls == [3]
+    assert results == [[], ['Write a cli snake game'], ['Write a cli snake game']]
+    assert [[i.content for i in memory_storage.search(q)] for q in queries] == results
+    memory_storage.clean()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/memory/transcript.py`
+
+import json
+
+from metagpt.actions import BossRequirement, WritePRD
+from metagpt.memory import Transcript
+from metagpt.schema import Message
+
+
+def test_transcript(tmp_path):
+    idea = Message(role='BOSS', content='Write a cli snake game', cause_by=BossRequirement)
+    prd = Message(role='Product Manager', content='PRD of snake game', cause_by=WritePRD)
+    transcript = Transcript()
+    transcript.append(idea)
+
+    path = tmp_path / 'transcript.jsonl'
+    transcript.stream_to(path)
+    transcript.append(prd)
+
+    assert str(transcript) == f"\n{idea}\n{prd}"
+    assert transcript[1:] == [prd]
+    assert list(transcript.iter_pages(page_size=1)) == [[idea], [prd]]
+    records = [json.loads(i) for i in path.read_text().splitlines()]
+    assert [i['cause_by'] for i in records] == ['BossRequirement', 'WritePRD']
+    assert records[1]['content'] == prd.content
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/provider/anthropic_api.py`
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+from metagpt.provider.anthropic_api import Claude2
+
+
+class _MockCompletions:
+    async def create(self, stream=False, **kwargs):
+        await asyncio.sleep(0.2)
+        if stream:
+            return self._stream()
+        return SimpleNamespace(completion="hello")
+
+    async def _stream(self):
+        for i in ["hel", "lo"]:
+            yield SimpleNamespace(completion=i)
+
+
+def test_messages_to_prompt():
+    claude = Claude2()
+    messages = [claude._system_msg("system"), claude._user_msg("hi"), claude._assistant_msg("hey"), claude._user_msg("bye")]
+    prompt = claude.messages_to_prompt(messages)
+    assert prompt == f"{anthropic.HUMAN_PROMPT} system\n\nhi{anthropic.AI_PROMPT} hey{anthropic.HUMAN_PROMPT} bye{anthropic.AI_PROMPT}"
+
+
+def test_messages_to_prompt_starts_with_human():
+    claude = Claude2()
+    for messages in ([claude._default_system_msg(), claude._user_msg("hi")],
+                     [claude._system_msg("system")],
+                     [claude._assistant_msg("hey"), claude._user_msg("bye")]):
+        assert claude.messages_to_prompt(messages).startswith(anthropic.HUMAN_PROMPT)
+
+
+@pytest.mark.asyncio
+async def test_aask_concurrently():
+    claude = Claude2()
+    claude.aclient = SimpleNamespace(completions=_MockCompletions())
+    claude.client.count_tokens("load the tokenizer before timing")
+
+    start = time.monotonic()
+    rsps = await asyncio.gather(claude.aask("hi"), claude.acompletion_text([claude._user_msg("hi")]))
+    assert rsps == ["hello", "hello"]
+    assert time.monotonic() - start < 0.35
+    assert await claude.acompletion_batch_text([[claude._user_msg("hi")]] * 2) == ["hello", "hello"]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/provider/batch_engine.py`
+
+import asyncio
+from functools import partial
+
+import pytest
+
+from metagpt.provider.batch_engine import AIMDLimit, as_completed_adaptive
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_aimd_limit():
+    limit = AIMDLimit(initial=4, maximum=5)
+    for _ in range(8):
+        limit.on_success(0.1)
+    assert limit.limit == 5
+
+    limit.on_throttle()
+    assert limit.limit == 2
+
+    limit.on_success(1.0)  # far slower than the best latency seen
+    assert limit.value < 2.5
+
+
+@pytest.mark.asyncio
+async def test_as_completed_adaptive_order():
+    async def work(i, delay):
+        await asyncio.sleep(delay)
+        return i * 10
+
+    delays = [0.3, 0.1, 0.2]
+    results = [r async for r in as_completed_adaptive([partial(work, i, d) for i, d in enumerate(delays)])]
+    assert results == [(1, 10), (2, 20), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_as_completed_adaptive_bounded():
+    running = 0
+    peak = 0
+
+    async def work(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i
+
+    results = [r async for r in as_completed_adaptive([partial(work, i) for i in range(20)], AIMDLimit(initial=3))]
+    assert sorted(idx for idx, _ in results) == list(range(20))
+    assert 3 <= peak < 20
+
+
+@pytest.mark.asyncio
+async def test_as_completed_adaptive_throttle():
+    calls = {}
+
+    async def work(i):
+        calls[i] = calls.get(i, 0) + 1
+        if i == 1 and calls[i] < 3:
+            raise RateLimitError()
+        return i
+
+    limit = AIMDLimit(initial=8)
+    results = dict([r async for r in as_completed_adaptive([partial(work, i) for i in range(3)], limit)])
+    assert results == {0: 0, 1: 1, 2: 2}
+    assert calls[1] == 3
+    assert limit.limit < 8
+
+
+@pytest.mark.asyncio
+async def test_as_completed_adaptive_error():
+    async def work(i):
+        if i == 0:
+            raise ValueError("boom")
+        await asyncio.sleep(1)
+
+    with pytest.raises(ValueError):
+        async for _ in as_completed_adaptive([partial(work, i) for i in range(3)]):
+            pass
@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/provider/http_pool.py`
+
+import pytest
+
+from metagpt.provider.http_pool import close_aiohttp_session, get_aiohttp_session
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_session_reused():
+    session = get_aiohttp_session()
+    assert get_aiohttp_session() is session
+
+    await close_aiohttp_session()
+    assert session.closed
+    assert get_aiohttp_session() is not session
+    await close_aiohttp_session()
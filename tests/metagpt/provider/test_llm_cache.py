@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/provider/llm_cache.py`
+
+import pytest
+
+from metagpt.provider.llm_cache import LLMCache
+from metagpt.provider.openai_api import CostManager, OpenAIGPTAPI
+from metagpt.utils.singleton import Singleton
+
+
+@pytest.fixture
+def cache(tmp_path):
+    Singleton._instances.pop(LLMCache, None)
+    yield LLMCache(tmp_path / "llm_cache.sqlite", ttl=0, max_entries=2)
+    Singleton._instances.pop(LLMCache, None)
+
+
+def test_llm_cache_lru(cache):
+    keys = [LLMCache.make_key("gpt-4", [{"role": "user", "content": str(i)}], 0.3, 100) for i in range(3)]
+    assert len(set(keys)) == 3
+
+    cache.set(keys[0], "0")
+    cache.set(keys[1], "1")
+    assert cache.get(keys[0]) == "0"  # keys[1] becomes the least recently used one
+    cache.set(keys[2], "2")
+    assert cache.count() == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == "2"
+
+
+def test_llm_cache_ttl(cache):
+    cache.ttl = -1
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_acompletion_text_with_cache(cache):
+    llm = OpenAIGPTAPI()
+    llm._cache = cache
+    calls = []
+
+    async def _acompletion_text(messages, stream=False):
+        calls.append(messages)
+        return "hello"
+
+    llm._acompletion_text = _acompletion_text
+    cost_manager = CostManager()
+    hits, misses = cost_manager.cache_hits, cost_manager.cache_misses
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert await llm.acompletion_text(messages) == "hello"
+    assert await llm.acompletion_text(messages) == "hello"
+    assert len(calls) == 1
+    assert (cost_manager.cache_hits - hits, cost_manager.cache_misses - misses) == (1, 1)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/provider/rate_limiter.py`
+
+import time
+
+import pytest
+
+from metagpt.provider.rate_limiter import RateLimiter, get_rate_limiter
+
+
+def test_get_rate_limiter_shared():
+    assert get_rate_limiter("gpt-4") is get_rate_limiter("gpt-4")
+    assert get_rate_limiter("gpt-4") is not get_rate_limiter("gpt-4", "my-deployment")
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_tokens():
+    limiter = RateLimiter(rpm=0, tpm=600)  # 10 tokens per second
+
+    start = time.monotonic()
+    await limiter.acquire(600)
+    assert time.monotonic() - start < 0.1
+
+    limiter.reconcile(estimated=600, actual=100)  # 500 tokens given back
+    await limiter.acquire(400)
+    assert time.monotonic() - start < 0.1
+
+    await limiter.acquire(105)
+    assert time.monotonic() - start > 0.4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_requests():
+    limiter = RateLimiter(rpm=120)  # 2 requests per second
+    limiter.requests.available = 0
+
+    start = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - start > 0.4
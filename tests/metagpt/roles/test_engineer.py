@@ -31,6 +31,20 @@ async def test_engineer():
     assert "all done." == rsp.content
 
 
+@pytest.mark.asyncio
+async def test_engineer_task_graph_is_opt_in(monkeypatch):
+    async def _act_sp(self):
+        return "sp"
+
+    async def _act_mp(self):
+        return "mp"
+
+    monkeypatch.setattr(Engineer, "_act_sp", _act_sp)
+    monkeypatch.setattr(Engineer, "_act_mp", _act_mp)
+    assert await Engineer(n_borg=5)._act() == "sp"
+    assert await Engineer(n_borg=5, use_task_graph=True)._act() == "mp"
+
+
 def test_parse_str():
     for idx, i in enumerate(STRS_FOR_PARSING):
         text = CodeParser.parse_str(f"{idx+1}", i)
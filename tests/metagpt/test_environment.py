@@ -8,7 +8,7 @@
 
 import pytest
 
-from metagpt.actions import BossRequirement
+from metagpt.actions import Action, BossRequirement
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.manager import Manager
@@ -53,4 +53,83 @@ async def test_publish_and_process_message(env: Environment):
 
     await env.run(k=2)
     logger.info(f"{env.history=}")
-    assert len(env.history) > 10
+    assert len(str(env.history)) > 10
+
+
+class _Echo(Action):
+    async def run(self, *args, **kwargs):
+        return str(self)
+
+
+class _Ping(_Echo):
+    pass
+
+
+class _Pong(_Echo):
+    pass
+
+
+class _EchoRole(Role):
+    def __init__(self, profile, action, watch):
+        super().__init__(profile=profile)
+        self._init_actions([action])
+        self._watch(watch)
+        self.n_run = 0
+
+    async def _act(self) -> Message:
+        self.n_run += 1
+        return await super()._act()
+
+
+@pytest.mark.asyncio
+async def test_run_wakes_only_subscribers(env: Environment):
+    pinger = _EchoRole("Pinger", _Ping, [BossRequirement])
+    ponger = _EchoRole("Ponger", _Pong, [_Ping])
+    idler = _EchoRole("Idler", _Echo, [_Echo])
+    env.add_roles([pinger, ponger, idler])
+    env.publish_message(Message(role="BOSS", content="ping", cause_by=BossRequirement))
+
+    await env.run()
+
+    assert (pinger.n_run, ponger.n_run, idler.n_run) == (1, 1, 0)
+    assert not env.pending
+    assert [i.cause_by for i in env.memory.get()] == [BossRequirement, _Ping, _Pong]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_and_resume(env: Environment):
+    env.add_roles([_EchoRole("Pinger", _Ping, [BossRequirement]), _EchoRole("Ponger", _Pong, [_Ping])])
+    env.publish_message(Message(role="BOSS", content="ping", cause_by=BossRequirement))
+    states = []
+    await env.run(k=1, on_pass=lambda: states.append(env.dump_state()))
+    assert env.pending == ["Ponger"]
+
+    resumed = Environment()
+    pinger, ponger = _EchoRole("Pinger", _Ping, [BossRequirement]), _EchoRole("Ponger", _Pong, [_Ping])
+    resumed.add_roles([pinger, ponger])
+    resumed.load_state(states[-1])
+    assert resumed.pending == ["Ponger"]
+    assert pinger.n_run == 1 and pinger._rc.cursor == 1
+    assert [i.id for i in resumed.history] == [i.id for i in env.history]
+
+    await resumed.run()
+    assert (pinger.n_run, ponger.n_run) == (1, 1)
+    assert [i.cause_by for i in resumed.memory.get()] == [BossRequirement, _Ping, _Pong]
+
+
+@pytest.mark.asyncio
+async def test_publish_same_message_to_another_recipient(env: Environment):
+    ponger = _EchoRole("Ponger", _Pong, [_Ping])
+    env.add_role(ponger)
+    env.publish_message(Message(role="Pinger", content="ping", cause_by=_Ping, send_to="Idler"))
+    await env.run()
+    assert ponger.n_run == 1
+
+    env.publish_message(Message(role="Pinger", content="ping", cause_by=_Ping, send_to="Idler"))
+    assert not env.pending  # a re-publish of the same message is skipped
+
+    env.publish_message(Message(role="Pinger", content="ping", cause_by=_Ping, send_to="Ponger"))
+    assert env.pending == ["Ponger"]
+    await env.run()
+    assert ponger.n_run == 2
+    assert [i.send_to for i in env.history if i.cause_by == _Ping] == ["Idler", "Ponger"]
@@ -8,7 +8,7 @@
 
 import pytest
 
-from metagpt.llm import LLM
+from metagpt.llm import LLM, get_llm
 
 
 @pytest.fixture()
@@ -32,3 +32,10 @@ async def test_llm_acompletion(llm):
     assert len(await llm.acompletion(hello_msg)) > 0
     assert len(await llm.acompletion_batch([hello_msg])) > 0
     assert len(await llm.acompletion_batch_text([hello_msg])) > 0
+
+
+def test_get_llm_shared():
+    assert get_llm() is get_llm()
+    assert get_llm(model="gpt-3.5-turbo") is get_llm(model="gpt-3.5-turbo")
+    assert get_llm(model="gpt-3.5-turbo").model == "gpt-3.5-turbo"
+    assert get_llm(model="gpt-3.5-turbo") is not get_llm()
@@ -5,8 +5,12 @@
 @Author  : alexanderwu
 @File    : test_message.py
 """
+import pickle
+
 import pytest
 
+from metagpt.actions import BossRequirement
+
 from metagpt.schema import AIMessage, Message, RawMessage, SystemMessage, UserMessage
 
 
@@ -34,3 +38,24 @@ def test_raw_message():
     assert msg['content'] == 'raw'
     with pytest.raises(KeyError):
         assert msg['1'] == 1, "KeyError: '1'"
+
+
+def test_message_id():
+    msg = Message(role='User', content='WTF', cause_by=BossRequirement)
+    assert msg.id == Message(role='User', content='WTF', cause_by=BossRequirement).id
+    assert msg.id != Message(role='User', content='WTF').id
+    assert msg.id != Message(role='QA', content='WTF', cause_by=BossRequirement).id
+
+
+def test_message_immutable_and_shared():
+    msg = Message(role='User', content='WTF', cause_by=BossRequirement)
+    with pytest.raises(AttributeError):
+        msg.content = 'changed'
+    assert msg.replace(content='changed').content == 'changed'
+    assert str(msg) is str(msg)
+
+    copy = pickle.loads(pickle.dumps(msg))
+    assert copy == msg and copy is not msg
+    assert copy.intern() is msg.intern()
+    assert Message(role='User', content='WTF', cause_by=BossRequirement, send_to='QA').intern() is not msg.intern()
+    assert SystemMessage('test').role == 'system'
@@ -5,10 +5,32 @@
 @Author  : alexanderwu
 @File    : test_role.py
 """
+import pytest
+
+from metagpt.actions import BossRequirement
+from metagpt.environment import Environment
 from metagpt.roles import Role
+from metagpt.schema import Message
 
 
 def test_role_desc():
     i = Role(profile='Sales', desc='Best Seller')
     assert i.profile == 'Sales'
     assert i._setting.desc == 'Best Seller'
+
+
+@pytest.mark.asyncio
+async def test_role_observe_incrementally():
+    role = Role(profile='Product Manager')
+    role._watch([BossRequirement])
+    env = Environment()
+    env.add_role(role)
+
+    env.publish_message(Message(role='BOSS', content='Write a cli snake game', cause_by=BossRequirement))
+    assert await role._observe() == 1
+    assert await role._observe() == 0
+    assert role._rc.cursor == 1
+
+    env.publish_message(Message(role='BOSS', content='Write a 2048 game', cause_by=BossRequirement))
+    assert await role._observe() == 1
+    assert role._rc.cursor == 2
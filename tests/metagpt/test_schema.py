@@ -5,7 +5,17 @@
 @Author  : alexanderwu
 @File    : test_schema.py
 """
-from metagpt.schema import AIMessage, Message, SystemMessage, UserMessage
+from metagpt.schema import (
+    AIMessage,
+    CodeBatch,
+    CodeFile,
+    FileInfo,
+    Message,
+    RunResult,
+    SystemMessage,
+    UserMessage,
+)
+from metagpt.utils.serialize import deserialize_message, serialize_message
 
 
 def test_messages():
@@ -19,3 +29,18 @@ def test_messages():
     text = str(msgs)
     roles = ['user', 'system', 'assistant', 'QA']
     assert all([i in text for i in roles])
+
+
+def test_payloads():
+    code_batch = CodeBatch(files=[CodeFile(filename='main.py', path='/ws/main.py'), CodeFile(filename='game.py', path='/ws/game.py')])
+    msg = Message(str(code_batch), instruct_content=code_batch)
+    assert CodeBatch.from_message(msg) is code_batch
+    assert CodeBatch.from_message(Message(msg.content)) == code_batch
+
+    file_info = FileInfo(file_name='game.py', file_path='/ws/game.py', test_file_name='test_game.py',
+                         test_file_path='/ws/tests/test_game.py', command=['python', 'tests/test_game.py'])
+    run_result = RunResult(file_info=file_info, result='## Status:\nPASS')
+    msg = Message(str(run_result), instruct_content=run_result)
+    assert RunResult.from_message(Message(msg.content)) == run_result
+    assert FileInfo.from_message(Message(str(file_info))) == file_info
+    assert deserialize_message(serialize_message(msg)).instruct_content == run_result
@@ -7,8 +7,46 @@
 """
 import pytest
 
+from metagpt.actions import (
+    Action,
+    BossRequirement,
+    RunCode,
+    WriteCode,
+    WriteDesign,
+    WritePRD,
+    WriteTasks,
+    WriteTest,
+)
+from metagpt.config import CONFIG
 from metagpt.logs import logger
+from metagpt.roles import (
+    Architect,
+    Engineer,
+    ProductManager,
+    ProjectManager,
+    QaEngineer,
+    Role,
+)
+from metagpt.schema import Message
 from metagpt.software_company import SoftwareCompany
+from metagpt.utils.common import NoMoneyException
+
+
+class _Ping(Action):
+    async def run(self, *args, **kwargs):
+        CONFIG.total_cost += 1.0
+        return f"{self} {CONFIG.total_cost}"
+
+
+class _Pong(_Ping):
+    pass
+
+
+class _Spender(Role):
+    def __init__(self, profile, action, watch):
+        super().__init__(profile=profile)
+        self._init_actions([action])
+        self._watch(watch)
 
 
 @pytest.mark.asyncio
@@ -17,3 +55,80 @@ async def test_software_company():
     company.start_project("做一个基础搜索引擎，可以支持知识库")
     history = await company.run(n_round=5)
     logger.info(history)
+
+
+@pytest.mark.asyncio
+async def test_software_company_budget_and_rounds(monkeypatch, tmp_path):
+    monkeypatch.setattr(CONFIG, "total_cost", 0.0)
+    monkeypatch.setattr(CONFIG, "max_budget", 10.0)
+    company = SoftwareCompany(checkpoint_path=tmp_path / "company.pkl")
+    company.hire([_Spender("Pinger", _Ping, [BossRequirement, _Pong]), _Spender("Ponger", _Pong, [_Ping])])
+    company.environment.publish_message(Message(role="BOSS", content="spend", cause_by=BossRequirement))
+    await company.run(n_round=1)
+    assert CONFIG.total_cost == 4.0  # the roles wake each other up forever, only the passes of one round ran
+
+    company.invest(5.5)
+    with pytest.raises(NoMoneyException):
+        await company.run(n_round=10)
+    assert CONFIG.total_cost == 6.0  # checked after every pass
+
+
+@pytest.mark.asyncio
+async def test_software_company_resume(monkeypatch, tmp_path):
+    monkeypatch.setattr(CONFIG, "total_cost", 0.0)
+    monkeypatch.setattr(CONFIG, "max_budget", 10.0)
+    with pytest.raises(FileNotFoundError):
+        SoftwareCompany(checkpoint_dir=tmp_path).resume()
+
+    for idea in ["ping", "pong"]:
+        company = SoftwareCompany(checkpoint_dir=tmp_path)
+        company.hire([_Spender("Pinger", _Ping, [BossRequirement, _Pong]), _Spender("Ponger", _Pong, [_Ping])])
+        company.idea = idea
+        company.environment.publish_message(Message(role="BOSS", content=idea, cause_by=BossRequirement))
+        await company.run(n_round=1)
+    assert len(list(tmp_path.glob("software_company_*.pkl"))) == 2
+
+    company = SoftwareCompany(checkpoint_dir=tmp_path)
+    company.hire([_Spender("Pinger", _Ping, [BossRequirement, _Pong]), _Spender("Ponger", _Pong, [_Ping])])
+    company.resume("ping")
+    assert company.idea == "ping" and company.environment.pending == ["Pinger"]
+
+    latest = SoftwareCompany(checkpoint_dir=tmp_path)
+    latest.resume()
+    assert latest.idea == "pong"
+
+
+@pytest.mark.asyncio
+async def test_software_company_runs_tests(monkeypatch, tmp_path):
+    monkeypatch.setattr(CONFIG, "total_cost", 0.0)
+    monkeypatch.setattr(CONFIG, "max_budget", 10.0)
+
+    async def _write(self, *args, **kwargs):
+        return f"{type(self).__name__} done"
+
+    async def _write_tasks(self, *args, **kwargs):
+        return '## Task list\n```python\n["main.py"]\n```'
+
+    async def _write_code(self, *args, **kwargs):
+        return "print('hello')"
+
+    ran = []
+
+    async def _run_code(self, code, **kwargs):
+        ran.append(kwargs["test_file_name"])
+        return "PASS\n## Send To: NoOne"
+
+    for action in [WritePRD, WriteDesign]:
+        monkeypatch.setattr(action, "run", _write)
+    monkeypatch.setattr(WriteTasks, "run", _write_tasks)
+    monkeypatch.setattr(WriteCode, "run", _write_code)
+    monkeypatch.setattr(WriteTest, "run", _write_code)
+    monkeypatch.setattr(RunCode, "run", _run_code)
+    monkeypatch.setattr(Engineer, "get_workspace", lambda self: tmp_path / "src")
+    monkeypatch.setattr(QaEngineer, "get_workspace", lambda self, return_proj_dir=True: tmp_path)
+
+    company = SoftwareCompany(checkpoint_path=tmp_path / "company.pkl")
+    company.hire([ProductManager(), Architect(), ProjectManager(), Engineer(), QaEngineer()])
+    company.start_project("print hello")
+    await company.run()
+    assert ran == ["test_main.py"]  # the QA loop is reached within the default rounds
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/utils/process_pool.py`
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from metagpt.utils.process_pool import TRUNCATED, ProcessPool
+
+
+@pytest.mark.asyncio
+async def test_process_pool_concurrent():
+    pool = ProcessPool(workers=4)
+    command = [sys.executable, "-c", "import time; time.sleep(0.5); print('done')"]
+    start = time.monotonic()
+    results = await asyncio.gather(*(pool.run(command) for _ in range(4)))
+    assert time.monotonic() - start < 1.5
+    assert all(i == ("done\n", "", 0) for i in results)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_timeout():
+    pool = ProcessPool(timeout=0.5)
+    start = time.monotonic()
+    out, _, returncode = await pool.run([sys.executable, "-c", "print('start', flush=True); import time; time.sleep(10)"])
+    assert time.monotonic() - start < 5
+    assert returncode is None
+    assert out == "start\n"
+
+
+@pytest.mark.asyncio
+async def test_process_pool_output_cap():
+    pool = ProcessPool(max_output=100)
+    out, err, returncode = await pool.run([sys.executable, "-c", "print('x' * 100000); 1 / 0"])
+    assert out == "x" * 100 + TRUNCATED
+    assert "ZeroDivisionError" in err
+    assert returncode == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX only")
+async def test_process_pool_memory_limit():
+    pool = ProcessPool(memory_limit=200)
+    _, err, returncode = await pool.run([sys.executable, "-c", "x = bytearray(1024 * 1024 * 1024)"])
+    assert returncode != 0
+    assert "MemoryError" in err
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/utils/task_graph.py`
+
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from metagpt.utils.task_graph import TaskScheduler, parse_dependencies
+
+TASK_LIST = ["main.py", "game.py", "snake.py", "utils/food.py"]
+LOGIC_ANALYSIS = [
+    ("main.py", "Entry point, runs Game from game.py"),
+    ("game.py", "Game class, uses Snake of snake.py and Food of food.py"),
+    ("snake.py", "Snake class"),
+    ("utils/food.py", "Food class"),
+]
+
+
+def test_parse_dependencies():
+    deps = parse_dependencies(TASK_LIST, LOGIC_ANALYSIS)
+    assert deps == {
+        "main.py": {"game.py"},
+        "game.py": {"snake.py", "utils/food.py"},
+        "snake.py": set(),
+        "utils/food.py": set(),
+    }
+    assert parse_dependencies(TASK_LIST) == {i: set() for i in TASK_LIST}
+
+
+@pytest.mark.asyncio
+async def test_task_scheduler_critical_path():
+    started, received = [], {}
+
+    async def write(node, deps):
+        started.append(node)
+        received[node] = deps
+        await asyncio.sleep(0.1 if node == "snake.py" else 0.01)
+        return node.upper()
+
+    scheduler = TaskScheduler(parse_dependencies(TASK_LIST, LOGIC_ANALYSIS), concurrency=4)
+    start = time.monotonic()
+    results = await scheduler.run(write)
+    assert time.monotonic() - start < 0.2
+    assert results == {i: i.upper() for i in TASK_LIST}
+    assert started[:2] == ["snake.py", "utils/food.py"]
+    assert received["game.py"] == {"snake.py": "SNAKE.PY", "utils/food.py": "UTILS/FOOD.PY"}
+    assert received["main.py"] == {"game.py": "GAME.PY"}
+
+
+@pytest.mark.asyncio
+async def test_task_scheduler_retry_and_cancel():
+    calls = Counter()
+
+    async def write(node, deps):
+        calls[node] += 1
+        if node == "snake.py" and calls[node] == 1:
+            raise ValueError("flaky")
+        if node == "utils/food.py":
+            raise ValueError("broken")
+        return node
+
+    scheduler = TaskScheduler(parse_dependencies(TASK_LIST, LOGIC_ANALYSIS), concurrency=2, max_retries=1)
+    results = await scheduler.run(write)
+    assert results == {"snake.py": "snake.py"}
+    assert calls["snake.py"] == 2 and calls["utils/food.py"] == 2
+    assert list(scheduler.failed) == ["utils/food.py"]
+    assert scheduler.cancelled == {"utils/food.py", "game.py", "main.py"}
+
+
+@pytest.mark.asyncio
+async def test_task_scheduler_cycle():
+    order = []
+
+    async def write(node, deps):
+        order.append(node)
+        return node
+
+    results = await TaskScheduler({"a": {"b"}, "b": {"a"}, "c": set()}).run(write)
+    assert order == ["c", "a", "b"]
+    assert set(results) == {"a", "b", "c"}
@@ -2,6 +2,7 @@ import pytest
 
 from metagpt.utils.text import (
     decode_unicode_escape,
+    fit_segments,
     generate_prompt_chunk,
     reduce_message_length,
     split_paragraph,
@@ -35,6 +36,17 @@ def test_reduce_message_length(msgs, model_name, system_text, reserved, expected
     assert len(reduce_message_length(msgs, model_name, system_text, reserved)) / (len("Hello,")) / 1000 == expected
 
 
+def test_fit_segments():
+    segments = ["Hello," * 1000] * 20
+    ret = fit_segments(segments, "".join, "gpt-4", "System", 2000)
+    assert len(ret) / len("Hello,") / 1000 == 3
+
+    priorities = [i % 2 for i in range(20)]
+    ret = fit_segments(list(range(20)), lambda kept: "Hello," * 1000 * len(kept) + str(kept), "gpt-4", "System",
+                       2000, priorities)
+    assert ret.endswith("[1, 3, 5]")
+
+
 @pytest.mark.parametrize(
     "text, prompt_template, model_name, system_text, reserved, expected",
     [
@@ -49,6 +61,21 @@ def test_generate_prompt_chunk(text, prompt_template, model_name, system_text, r
     assert len(ret) == expected
 
 
+def test_generate_prompt_chunk_lines():
+    text = "".join(f"{_paragraphs(100)}\n" for _ in range(50))
+    ret = list(generate_prompt_chunk(text, "{}", "gpt-3.5-turbo", "System", 1500))
+    assert len(ret) > 1
+    assert "".join(ret) == text
+    assert all(i.endswith("\n") for i in ret)
+
+
+def test_generate_prompt_chunk_overlap():
+    text = _paragraphs(2000)
+    ret = list(generate_prompt_chunk(text, "{}", "gpt-3.5-turbo", "System", 1500, overlap=50))
+    assert len(ret) > 1
+    assert all(ret[i + 1][:20] in ret[i] for i in range(len(ret) - 1))
+
+
 @pytest.mark.parametrize(
     "paragraph, sep, count, expected",
     [
@@ -7,7 +7,12 @@
 """
 import pytest
 
-from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
+from metagpt.utils.token_counter import (
+    count_message_tokens,
+    count_string_tokens,
+    count_strings_tokens,
+    get_encoding,
+)
 
 
 def test_count_message_tokens():
@@ -67,3 +72,18 @@ def test_count_string_tokens_gpt_4():
 
     string = "Hello, world!"
     assert count_string_tokens(string, model_name="gpt-4-0314") == 4
+
+
+def test_count_strings_tokens():
+    """Test that a batch is counted like single strings, including repeated ones."""
+
+    strings = ["Hello, world!", "", "Hello, world!", "System"]
+    assert count_strings_tokens(strings, model_name="gpt-3.5-turbo-0301") == [
+        count_string_tokens(i, model_name="gpt-3.5-turbo-0301") for i in strings
+    ]
+
+
+def test_get_encoding_cached():
+    """Test that the encoding is resolved once per model."""
+
+    assert get_encoding("gpt-4") is get_encoding("gpt-4")